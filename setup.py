@@ -56,6 +56,45 @@ class jc_test(Command):
 		sys.exit(not result.wasSuccessful())
 
 
+class jc_bench(Command):
+	user_options = [
+		('baselines=', None, 'directory of the JSON baselines to compare with'),
+		('save', None, 'store the results as the new baselines'),
+	]
+	boolean_options = ['save']
+
+	def initialize_options(self):
+		self.build_base = None
+		self.build_lib = None
+		self.baselines = None
+		self.save = False
+
+	def finalize_options(self):
+		self.set_undefined_options('build', ('build_lib', 'build_lib'))
+		if self.baselines is None:
+			self.baselines = os.path.join('tests', 'benchmarks', 'baselines')
+
+	def run(self):
+		self.run_command('build')
+
+		sys.path.insert(0, 'tests')
+		sys.path.insert(0, self.build_lib)
+
+		import benchmarks
+		slower = []
+		for name in benchmarks.__all__:
+			results = getattr(benchmarks, name).run()
+			path = os.path.join(self.baselines, name + '.json')
+			baseline = benchmarks.load_baseline(path)
+			if baseline:
+				print("Compared to %s:" % path)
+				slower += benchmarks.compare(results, baseline)
+			if self.save:
+				benchmarks.save_baseline(path, results)
+		if slower and not self.save:
+			sys.exit("Slower than the baselines: %s" % ', '.join(slower))
+
+
 class jc_install(install):
 	"""
 	Generate and install the jdk defaults configuration file.
@@ -95,6 +134,7 @@ setup(
 	cmdclass = {
 		'build' : jc_build,
 		'test' : jc_test,
+		'bench' : jc_bench,
 		'install' : jc_install,
 	},
 	name = 'java-config',
@@ -111,7 +151,7 @@ setup(
 	url = 'http://www.gentoo.org',
 	packages = ['java_config_2'],
 	package_dir = { 'java_config_2' : 'src/java_config_2' },
-	scripts = ['src/java-config-2','src/depend-java-query','src/gjl'],
+	scripts = ['src/java-config-2','src/depend-java-query','src/gjl','src/java-config-server'],
 	data_files = [
 		(eprefix + '/usr/share/java-config-2/launcher', ['src/launcher.bash']),
 		(eprefix + '/usr/share/man/man1/', ['man/java-config-2.1']),
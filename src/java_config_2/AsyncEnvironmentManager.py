@@ -0,0 +1,104 @@
+# -*- coding: UTF-8 -*-
+# Copyright 2004-2013 Gentoo Foundation
+# Distributed under the terms of the GNU General Public License v2
+
+"""
+Coroutines answering the questions of EnvironmentManager and
+VersionManager for programs running an asyncio event loop:
+
+    manager = AsyncEnvironmentManager(root)
+    vm = await manager.resolve_vm('>=virtual/jdk-1.8')
+    classpath = await manager.build_dep_path(['ant-core'], 'CLASSPATH', set(), vm)
+"""
+
+from .EnvironmentManager import EnvironmentManager
+from .VersionManager import VersionManager
+
+import asyncio
+
+
+class AsyncEnvironmentManager(object):
+    """
+    Runs the methods of a thread safe EnvironmentManager in an executor,
+    the default one of the loop unless one is given, so that reading
+    and parsing env files does not block the event loop. Coroutines
+    awaiting the same package, vm or resolution at the same time share
+    one call, and what the manager has already loaded is returned
+    without leaving the loop.
+    """
+
+    def __init__(self, root='', eprefix='', use_cache=False, manager=None, executor=None):
+        if manager is None:
+            manager = EnvironmentManager(root, eprefix, use_cache=use_cache, threadsafe=True)
+        elif not manager.threadsafe:
+            raise ValueError("AsyncEnvironmentManager needs a threadsafe EnvironmentManager")
+        self.manager = manager
+        self.verman = VersionManager(manager)
+        self.executor = executor
+        # The futures of the calls running, by key, see coalesce
+        self.pending = {}
+
+    def run(self, function, *args):
+        """
+        Runs function(*args) in the executor, returns a future.
+        """
+        return asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+    def coalesce(self, key, function, *args):
+        """
+        Returns the future of the running call for key, or runs
+        function(*args) for it.
+        """
+        future = self.pending.get(key)
+        if future is None:
+            future = self.pending[key] = self.run(function, *args)
+            future.add_done_callback(lambda done: self.pending.pop(key, None))
+        # Cancelling one of the waiting coroutines must not cancel the call
+        return asyncio.shield(future)
+
+    async def get_package(self, name):
+        pkg = self.manager.packages.get(name)
+        if pkg is not None:
+            return pkg
+        return await self.coalesce(('package', name), self.manager.get_package, name)
+
+    async def get_packages(self):
+        if self.manager.all_packages_loaded:
+            return self.manager.packages
+        return await self.coalesce(('packages',), self.manager.get_packages)
+
+    async def get_vm(self, machine):
+        return await self.coalesce(('vm', machine), self.manager.get_vm, machine)
+
+    async def get_active_vm(self):
+        vm = self.manager.active_vm
+        if vm is not None:
+            return vm
+        return await self.coalesce(('active-vm',), self.manager.get_active_vm)
+
+    async def build_path(self, pkgs, query, vm=None):
+        return await self.run(self.manager.build_path, pkgs, query, vm)
+
+    async def build_dep_path(self, pkgs, query, missing_deps, vm=None):
+        return await self.run(self.manager.build_dep_path, pkgs, query, missing_deps, vm)
+
+    async def build_dep_env_vars(self, pkgs, missing_deps, vm=None):
+        return await self.run(self.manager.build_dep_env_vars, pkgs, missing_deps, vm)
+
+    async def resolve_vm(self, atoms, allow_build_only=False):
+        """
+        The best vm for the dependency string atoms, see VersionManager.get_vm.
+        """
+        return await self.coalesce(('resolve', atoms, allow_build_only),
+                                   self.verman.get_vm, atoms, allow_build_only)
+
+    async def get_lowest(self, atoms):
+        return await self.run(self.verman.get_lowest, atoms)
+
+    async def version_satisfies(self, atoms, vm):
+        return await self.run(self.verman.version_satisfies, atoms, vm)
+
+    async def snapshot(self):
+        return await self.coalesce(('snapshot',), self.manager.snapshot)
+
+# vim:set expandtab tabstop=4 shiftwidth=4 softtabstop=4 nowrap:
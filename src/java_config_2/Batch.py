@@ -0,0 +1,157 @@
+# -*- coding: UTF-8 -*-
+# Copyright 2004-2013 Gentoo Foundation
+# Distributed under the terms of the GNU General Public License v2
+
+from .Errors import encode_error
+
+import json
+
+
+def parse_request(line):
+    """
+    Parse one request line. A request is either a JSON object like
+    the ones sent to the java-config server, e.g.
+    {"op": "path", "args": {"packages": ["ant-core"], "query": "CLASSPATH"}},
+    or the same written as words: path packages=ant-core query=CLASSPATH.
+    Lists of packages are separated by ',', true and false are booleans.
+    """
+    line = line.strip()
+    if line.startswith('{'):
+        request = json.loads(line)
+        if not isinstance(request, dict) or 'op' not in request:
+            raise ValueError("Request without op: %s" % line)
+        return request
+
+    words = line.split()
+    request = {'op': words[0], 'args': {}}
+    for word in words[1:]:
+        key, sep, value = word.partition('=')
+        if not sep:
+            raise ValueError("Expected key=value: %s" % word)
+        if key == 'packages':
+            value = value.split(',')
+        elif value in ('true', 'false'):
+            value = value == 'true'
+        if key in ('id', 'vm'):
+            request[key] = value
+        else:
+            request['args'][key] = value
+    return request
+
+# The queries of depend-java-query, which all take a dependency string
+depend_ops = ('get-vm', 'get-lowest', 'is-sufficient', 'parse-depend')
+
+def parse_depend_request(line):
+    """
+    Parse one request line of depend-java-query: a JSON object as for
+    parse_request, or an operation followed by the dependency string,
+    e.g. get-vm >=virtual/jdk-1.5 java-virtuals/jaf. Like
+    depend-java-query --get-vm, get-vm allows build only vms.
+    """
+    line = line.strip()
+    if line.startswith('{'):
+        return parse_request(line)
+
+    words = line.split(None, 1)
+    if words[0] not in depend_ops:
+        raise ValueError("Unknown query: %s, use one of: %s" % (words[0], ', '.join(depend_ops)))
+    request = {'op': words[0], 'args': {'depend': len(words) > 1 and words[1] or ''}}
+    if words[0] == 'get-vm':
+        request['args']['allow_build_only'] = True
+    return request
+
+def render(op, result):
+    """
+    The plain text form of the result of a query.
+    """
+    if op == 'path':
+        return ':'.join(result['path'])
+    if op == 'package-query':
+        return result['value'] or ''
+    if op == 'launch':
+        return ':'.join(result.get('dep_classpath', []))
+    if op == 'parse-depend':
+        return ' '.join(equality + 'virtual/' + type + '-' + version for equality, type, version in result)
+    if isinstance(result, bool):
+        return result and 'true' or 'false'
+    if result is None:
+        return ''
+    return str(result)
+
+
+class Batch(object):
+    """
+    Answers a stream of queries with one QueryHandler, writing one
+    response per request, in the same order.
+
+    In json format every response is a line like those of the
+    java-config server, with the id of the request if it had one.
+    In nul format every response is 0 or 1 for success or failure,
+    a tab and the result or error message, terminated by a NUL.
+    The text format is the same on one line, terminated by a newline.
+
+    parse turns a line into a request, see parse_request and
+    parse_depend_request.
+    """
+
+    formats = ('json', 'nul', 'text')
+
+    def __init__(self, handler, output, format='json', parse=parse_request):
+        if format not in self.formats:
+            raise ValueError("Unknown batch format: %s" % format)
+        self.handler = handler
+        self.output = output
+        self.format = format
+        self.parse = parse
+        self.failed = 0
+
+    def answer(self, request):
+        try:
+            result = self.handler.query(request['op'], vm=request.get('vm'), **request.get('args', {}))
+            if request['op'] == 'path' and result['missing']:
+                return {'status': 'error', 'result': result, 'error': {'type': 'UnexistingPackageError',
+                    'message': ', '.join(result['missing']), 'package': result['missing'][0]}}
+            if request['op'] == 'package-query' and result['value'] is None:
+                return {'status': 'error', 'result': result, 'error': {'type': 'EnvironmentUndefinedError',
+                    'message': "Package %s does not define %s" % (result['name'], request.get('args', {}).get('var'))}}
+            return {'status': 'ok', 'result': result}
+        except Exception as e:
+            return {'status': 'error', 'error': encode_error(e)}
+
+    def write(self, request, response):
+        if response['status'] != 'ok':
+            self.failed += 1
+        if self.format == 'json':
+            if request and 'id' in request:
+                response['id'] = request['id']
+            self.output.write(json.dumps(response) + '\n')
+        else:
+            status = response['status'] == 'ok' and '0' or '1'
+            if 'result' in response:
+                text = render(request['op'], response['result'])
+            else:
+                text = response['error']['message']
+            if self.format == 'text':
+                self.output.write('%s\t%s\n' % (status, ' '.join(text.split('\n'))))
+            else:
+                self.output.write('%s\t%s\0' % (status, text))
+        self.output.flush()
+
+    def run(self, input):
+        """
+        Answer every request read from input.
+        Returns the number of requests which failed.
+        """
+        for line in input:
+            if not line.strip() or line.startswith('#'):
+                continue
+            request = None
+            try:
+                request = self.parse(line)
+                response = self.answer(request)
+            except ValueError as e:
+                response = {'status': 'error', 'error': {'type': 'ValueError', 'message': str(e)}}
+            self.write(request, response)
+        return self.failed
+
+# vim:set expandtab tabstop=4 shiftwidth=4 softtabstop=4 nowrap:
@@ -0,0 +1,187 @@
+# -*- coding: UTF-8 -*-
+# Copyright 2004-2013 Gentoo Foundation
+# Distributed under the terms of the GNU General Public License v2
+
+from .FileParser import EnvFileParser
+from .Errors import InvalidConfigError, PermissionError
+from . import Trace
+
+import atexit
+import errno
+import os
+
+from types import MappingProxyType
+
+
+class PersistentCache(object):
+    """
+    A dictionary which is loaded from and saved to a file on disk.
+    Loading and saving are best effort: an unreadable, corrupt or
+    outdated cache file is treated as empty, and failing to write
+    it (e.g. when not running as root) is silently ignored.
+    Changes are written back when the interpreter exits.
+
+    Entries may only hold plain data, they are stored with marshal,
+    which unlike pickle does not run code while loading. Files which
+    could have been written by another user than root or the current
+    one are not loaded at all.
+    """
+
+    # Bump whenever the layout of the stored entries changes.
+    format = 1
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = None
+        self.dirty = False
+        self.registered = False
+
+    def load(self):
+        self.entries = {}
+        import marshal
+        try:
+            with open(self.path, 'rb') as stream:
+                if not self.trusted(os.fstat(stream.fileno())):
+                    return
+                data = marshal.load(stream)
+        except Exception:
+            return
+        if isinstance(data, tuple) and len(data) == 2 and data[0] == (self.__class__.__name__, self.format):
+            self.entries = data[1]
+
+    def trusted(self, st):
+        """
+        Whether a cache file with the stat result st was written by
+        root or the current user, and can not be changed by others.
+        """
+        return st.st_uid in (0, os.getuid()) and not st.st_mode & 0o022
+
+    def get_entries(self):
+        if self.entries is None:
+            self.load()
+        return self.entries
+
+    def mark_dirty(self):
+        self.dirty = True
+        if not self.registered:
+            atexit.register(self.save)
+            self.registered = True
+
+    def save(self):
+        if not self.dirty:
+            return False
+        # Writing outside of the allowed paths is a violation
+        # when we are called from within an ebuild.
+        if os.environ.get('SANDBOX_ON') == '1':
+            return False
+        # Only imported here, most runs never write the cache.
+        import marshal, tempfile
+        directory = os.path.dirname(self.path)
+        try:
+            if not os.path.isdir(directory):
+                os.makedirs(directory)
+            fd, tmp = tempfile.mkstemp(dir=directory, prefix='.cache-')
+            try:
+                with os.fdopen(fd, 'wb') as stream:
+                    marshal.dump(((self.__class__.__name__, self.format), self.entries), stream)
+                os.chmod(tmp, 0o644)
+                os.rename(tmp, self.path)
+            except:
+                os.unlink(tmp)
+                raise
+        except (IOError, OSError):
+            return False
+        self.dirty = False
+        return True
+
+
+class ConfigCache(PersistentCache):
+    """
+    Cache of parsed env files (package.env, virtuals and vm files).
+    Entries are keyed by path and are only used while the file's
+    mtime, size and inode are unchanged. Configurations are handed
+    out as read-only views of the cached dictionaries.
+    """
+
+    def get_config(self, file):
+        Trace.count('stat calls')
+        try:
+            st = os.stat(file)
+        except OSError as e:
+            if e.errno == errno.EACCES:
+                raise PermissionError
+            raise InvalidConfigError(file)
+
+        stamp = (st.st_mtime, st.st_size, st.st_ino)
+        entries = self.get_entries()
+        entry = entries.get(file)
+        if entry is not None and entry[0] == stamp:
+            Trace.count('config cache hits')
+            return MappingProxyType(entry[1])
+        Trace.count('config cache misses')
+
+        config = EnvFileParser(file).config
+        entries[file] = (stamp, config)
+        self.mark_dirty()
+        return MappingProxyType(config)
+
+    def save(self):
+        # Forget about files which have been removed since they were cached.
+        if self.dirty:
+            for file in [f for f in self.entries if not os.path.exists(f)]:
+                del self.entries[file]
+        return PersistentCache.save(self)
+
+
+class ResolutionCache(PersistentCache):
+    """
+    Cache of the vms picked by VersionManager.get_vm.
+    Entries are keyed by the dependency string and are only used
+    while the fingerprint of the vms and preferences they were
+    resolved against is unchanged, and the stamps of what only the
+    entry depends on, the files of its java-virtuals, too.
+    As with every PersistentCache nothing is written inside the
+    sandbox (SANDBOX_ON=1), so during an emerge only entries saved
+    by earlier runs outside of it are used.
+    """
+
+    # Entries are (fingerprint, stamps, result)
+    format = 2
+
+    def __init__(self, path):
+        PersistentCache.__init__(self, path)
+        self.fingerprint = None
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, fingerprint, stamps):
+        """
+        Returns the result stored for key, or None.
+        """
+        self.fingerprint = fingerprint
+        entry = self.get_entries().get(key)
+        if entry is not None and entry[0] == fingerprint and entry[1] == stamps:
+            self.hits += 1
+            Trace.count('resolution cache hits')
+            return entry[2]
+        self.misses += 1
+        Trace.count('resolution cache misses')
+        return None
+
+    def put(self, key, fingerprint, stamps, result):
+        self.fingerprint = fingerprint
+        self.get_entries()[key] = (fingerprint, stamps, result)
+        self.mark_dirty()
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses,
+                'entries': len(self.get_entries())}
+
+    def save(self):
+        # Results for other sets of vms will not be used again.
+        if self.dirty:
+            for key in [k for k, e in self.entries.items() if e[0] != self.fingerprint]:
+                del self.entries[key]
+        return PersistentCache.save(self)
+
+# vim:set expandtab tabstop=4 shiftwidth=4 softtabstop=4 nowrap:
\ No newline at end of file
@@ -0,0 +1,87 @@
+# -*- coding: UTF-8 -*-
+# Copyright 2004-2013 Gentoo Foundation
+# Distributed under the terms of the GNU General Public License v2
+
+from .Errors import ServerUnavailableError, decode_error
+
+import json
+import os
+import socket
+
+
+# Where the server listens unless told otherwise.
+DEFAULT_SOCKET = '/run/java-config-2/socket'
+
+# Environment variables of the client which influence query results.
+# The server sets them for every query, so it must only accept clients
+# it trusts with them, see the mode of Server.
+CLIENT_ENV = [ 'GENTOO_VM', 'HOME', 'USE' ]
+
+
+def socket_path():
+    return os.getenv('JAVA_CONFIG_SOCKET', DEFAULT_SOCKET)
+
+
+class Client(object):
+    """
+    Sends queries to a running java-config server.
+    Raises ServerUnavailableError if there is none, so callers can
+    fall back to answering the query themselves.
+    """
+
+    def __init__(self, root='', eprefix='', path=None):
+        self.root = root
+        self.eprefix = eprefix
+        self.path = path or socket_path()
+        self.sock = None
+        self.stream = None
+
+    def connect(self):
+        if os.getenv('JAVA_CONFIG_NO_SERVER'):
+            raise ServerUnavailableError()
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(self.path)
+        except (IOError, OSError):
+            sock.close()
+            raise ServerUnavailableError()
+        self.sock = sock
+        self.stream = sock.makefile('rwb')
+
+    def close(self):
+        if self.sock:
+            self.stream.close()
+            self.sock.close()
+            self.sock = None
+            self.stream = None
+
+    def query(self, op, **args):
+        if self.sock is None:
+            self.connect()
+
+        request = {
+            'root': self.root,
+            'eprefix': self.eprefix,
+            'env': dict((var, os.environ.get(var)) for var in CLIENT_ENV),
+            'op': op,
+            'args': args,
+        }
+        try:
+            self.stream.write(json.dumps(request).encode('utf-8') + b'\n')
+            self.stream.flush()
+            line = self.stream.readline()
+        except (IOError, OSError):
+            line = None
+        if not line:
+            self.close()
+            raise ServerUnavailableError()
+
+        response = json.loads(line.decode('utf-8'))
+        if response['status'] == 'ok':
+            return response['result']
+        if response['status'] == 'refused':
+            self.close()
+            raise ServerUnavailableError()
+        raise decode_error(response['error'])
+
+# vim:set expandtab tabstop=4 shiftwidth=4 softtabstop=4 nowrap:
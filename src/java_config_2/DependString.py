@@ -0,0 +1,153 @@
+# -*- coding: UTF-8 -*-
+# Copyright 2004-2013 Gentoo Foundation
+# Distributed under the terms of the GNU General Public License v2
+
+from .VersionKey import version_key
+from .LazyRegex import LazyRegex
+
+from functools import lru_cache
+
+
+class _DepSpec(dict):
+    def __eq__(self, other):
+        assert type(self) == type(other)
+        return dict.__eq__(self, other)
+
+    def __ne__(self, other):
+        assert type(self) == type(other)
+        return dict.__ne__(self, other)
+
+    def __lt__(self, other):
+        assert type(self) == type(other)
+
+        if self['version'] != other['version']:
+            return version_key(self['version']) < version_key(other['version'])
+        else:
+            if self['type'] != other['type']:
+                return self['type'] < other['type']
+            else:
+                return self['equality'] != other['equality']
+
+    def __gt__(self, other):
+        return not self.__lt__(other) and not self.__eq__(other)
+
+    def __le__(self, other):
+        return self.__lt__(other) or self.__eq__(other)
+
+    def __ge__(self, other):
+        return self.__gt__(other) or self.__eq__(other)
+
+
+def parse_tree(tokens, pos=0, depth=0):
+    """
+    Parses the tokens of a dependency string from pos up to the
+    parenthesis closing the group at depth. Returns the list of nodes
+    and the position after the group. Nodes are tuples:
+
+        ('atom', token)
+        ('use', flag, negated, nodes)    flag? ( ... ) or !flag? ( ... )
+        ('any', nodes)                   || ( ... )
+        ('all', nodes)                   ( ... )
+    """
+    nodes = []
+    end = len(tokens)
+    while pos < end:
+        token = tokens[pos]
+        pos += 1
+        if token == ')':
+            if depth:
+                break
+            continue
+        opens = pos < end and tokens[pos] == '('
+        if token == '(':
+            children, pos = parse_tree(tokens, pos, depth + 1)
+            nodes.append(('all', children))
+        elif token == '||' and opens:
+            children, pos = parse_tree(tokens, pos + 1, depth + 1)
+            nodes.append(('any', children))
+        elif token.endswith('?'):
+            children = []
+            if opens:
+                children, pos = parse_tree(tokens, pos + 1, depth + 1)
+            if token.startswith('!'):
+                nodes.append(('use', token[1:-1], True, children))
+            else:
+                nodes.append(('use', token[:-1], False, children))
+        else:
+            nodes.append(('atom', token))
+    return nodes, pos
+
+
+def reduce_tree(nodes, useflags, tokens):
+    """
+    Appends to tokens the atoms of nodes which are enabled by the set
+    useflags, and || in front of the atoms of || blocks.
+    """
+    for node in nodes:
+        kind = node[0]
+        if kind == 'atom':
+            tokens.append(node[1])
+        elif kind == 'use':
+            if (node[1] in useflags) != node[2]:
+                reduce_tree(node[3], useflags, tokens)
+        elif kind == 'any':
+            tokens.append('||')
+            reduce_tree(node[1], useflags, tokens)
+        else:
+            reduce_tree(node[1], useflags, tokens)
+    return tokens
+
+
+class DependString(object):
+    """
+    A dependency string parsed once, and what VersionManager wants to
+    know about it: the jdk/jre atoms, the packages and the
+    java-virtuals it needs. Without USE all conditionals count as
+    enabled, as for gjl, which does not know about use flags.
+    Use parse_depend_string, which remembers the recently parsed ones.
+    """
+
+    atom_parser = LazyRegex(r"([<>=]*)virtual/(jre|jdk)[-:]([0-9\.*]+)")
+    virtuals_parser = LazyRegex(r"([<>=~]+)?java-virtuals/([\w\-\.:]+)")
+    package_parser = LazyRegex(r"([\w\-]+)/([\w\-]+)(?:\:(\d+))?")
+
+    def __init__(self, atoms, use=None):
+        tokens = atoms.split()
+        self.tree = parse_tree(tokens)[0]
+        if use is None:
+            self.text = atoms
+        else:
+            tokens = reduce_tree(self.tree, set(use.split()), [])
+            self.text = ' '.join(tokens)
+        self.tokens = tuple(tokens)
+
+        vm_atoms = []
+        packages = []
+        virtuals = []
+        # None of the patterns matches across whitespace, looking at
+        # the tokens one by one finds what they find in the text.
+        for token in self.tokens:
+            for match in self.atom_parser.findall(token):
+                vm_atoms.append(_DepSpec(equality=match[0], type=match[1], version=match[2]))
+            for match in self.package_parser.findall(token):
+                if not (match[0] == 'virtual' and match[1] in ('jdk-1', 'jre-1', 'jdk', 'jre')):
+                    packages.append({'equality':'=', 'cat':match[0], 'pkg':match[1], 'slot':match[2]})
+            for match in self.virtuals_parser.findall(token):
+                virtuals.append(match[1].replace(':0', '').replace(':', '-'))
+
+        vm_atoms.sort()
+        vm_atoms.reverse()
+        self.vm_atoms = tuple(vm_atoms)
+        self.packages = tuple(packages)
+        self.virtuals = ' '.join(virtuals)
+
+
+@lru_cache(maxsize=256)
+def parse_depend_string(atoms, use=None):
+    """
+    Returns the DependString of atoms with the use flags use, a space
+    separated string. The result is shared and must not be changed.
+    """
+    return DependString(atoms, use)
+
+# vim:set expandtab tabstop=4 shiftwidth=4 softtabstop=4 nowrap:
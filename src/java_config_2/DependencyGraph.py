@@ -0,0 +1,87 @@
+# -*- coding: UTF-8 -*-
+# Copyright 2004-2013 Gentoo Foundation
+# Distributed under the terms of the GNU General Public License v2
+
+from .Errors import UnexistingPackageError
+
+
+class DependencyGraph(object):
+    """
+    The DEPEND/OPTIONAL_DEPEND graph of the packages of an EnvironmentManager.
+
+    Nodes are packages, edges are the dependency entries returned by
+    EnvironmentManager.get_pkg_deps, either [package] or [jar, package].
+    The edges and the closure of every package are only worked out once.
+    As virtuals depend on the active vm, the manager keeps a graph
+    for every vm.
+    """
+
+    def __init__(self, manager):
+        self.manager = manager
+        self._edges = {}
+        self._closures = {}
+
+    def edges(self, pkg):
+        """
+        Returns a list of (dep, package) tuples for the dependencies of pkg.
+        package is None if the dependency is not installed.
+        """
+        name = pkg.name()
+        edges = self._edges.get(name)
+        if edges is None:
+            edges = []
+            for dep in self.manager.get_pkg_deps(pkg):
+                try:
+                    p = self.manager.get_package(dep[-1])
+                except UnexistingPackageError:
+                    p = None
+                edges.append((dep, p))
+            self._edges[name] = edges
+        return edges
+
+    def closure(self, pkg):
+        """
+        Returns the packages reachable from pkg in breadth first order,
+        starting with pkg itself, and the set of names of the missing
+        dependencies found on the way.
+        """
+        name = pkg.name()
+        closure = self._closures.get(name)
+        if closure is None:
+            order = [pkg]
+            seen = set([name])
+            missing = set()
+            for node in order:
+                for dep, p in self.edges(node):
+                    if p is None:
+                        missing.add(dep[-1])
+                    elif p.name() not in seen:
+                        seen.add(p.name())
+                        order.append(p)
+            closure = (order, missing)
+            self._closures[name] = closure
+        return closure
+
+    def walk(self, pkgs):
+        """
+        Returns the packages reachable from any of pkgs, each of them once.
+        """
+        seen = set()
+        order = []
+        for pkg in pkgs:
+            for p in self.closure(pkg)[0]:
+                if p.name() not in seen:
+                    seen.add(p.name())
+                    order.append(p)
+        return order
+
+    def missing(self, pkgs):
+        """
+        Returns the names of the missing dependencies of pkgs.
+        """
+        missing = set()
+        for pkg in pkgs:
+            missing.update(self.closure(pkg)[1])
+        return missing
+
+# vim:set expandtab tabstop=4 shiftwidth=4 softtabstop=4 nowrap:
@@ -0,0 +1,128 @@
+# -*- coding: UTF-8 -*-
+# Copyright 2004-2013 Gentoo Foundation
+# Distributed under the terms of the GNU General Public License v2
+
+from . import Trace
+
+import os
+
+
+class DirectoryIndex(object):
+    """
+    Lists the directories java-config looks into once, instead of
+    globbing for every package: the package directories in /usr/share,
+    the virtuals and the vms. Names which turned out not to be a
+    package or virtual are remembered in missing.
+    """
+
+    def __init__(self, manager):
+        self.pkg_path = manager.pkg_path
+        self.share_path = os.path.dirname(os.path.dirname(manager.pkg_path % 'package'))
+        self.virtual_path = manager.virtual_path
+        self.vms_path = manager.vms_path
+        self.listings = {}
+        self.package_files = {}
+        self.missing = set()
+
+    def listing(self, path, directories=False):
+        """
+        Returns the set of names in path, or only those of directories.
+        """
+        key = (path, directories)
+        names = self.listings.get(key)
+        if names is None:
+            for name in self.scan(path, directories):
+                pass
+            names = self.listings[key]
+        return names
+
+    def scan(self, path, directories=False):
+        """
+        Yields the names in path, or only those of directories, in the
+        order the directory is read, or as listed before. The listing
+        is only remembered once it has been read completely.
+        """
+        key = (path, directories)
+        names = self.listings.get(key)
+        if names is not None:
+            for name in names:
+                yield name
+            return
+
+        names = set()
+        Trace.count('directories listed')
+        try:
+            for entry in os.scandir(path):
+                if not directories or entry.is_dir():
+                    names.add(entry.name)
+                    yield entry.name
+        except OSError:
+            pass
+        self.listings[key] = names
+
+    def package_names(self, sort=True):
+        """
+        Yields the names of the directories which may hold a package,
+        sorted or in the order they are found.
+        """
+        # Like glob, which skips hidden directories
+        names = self.scan(self.share_path, True)
+        if sort:
+            names = sorted(names)
+        for name in names:
+            if not name.startswith('.'):
+                yield name
+
+    def package_file(self, name):
+        """
+        Returns the package.env of the package name or None.
+        """
+        if name not in self.package_files:
+            if name in self.listing(self.share_path, True):
+                return self.directory_package_file(name)
+            self.package_files[name] = None
+        return self.package_files[name]
+
+    def directory_package_file(self, name):
+        """
+        Returns the package.env in the directory name of /usr/share or None.
+        """
+        if name not in self.package_files:
+            file = self.pkg_path % name
+            Trace.count('stat calls')
+            if not os.path.isfile(file):
+                file = None
+            self.package_files[name] = file
+        return self.package_files[name]
+
+    def iter_package_files(self, sort=True):
+        """
+        Yields the package.env files of all packages as they are found,
+        or sorted by name.
+        """
+        for name in self.package_names(sort):
+            file = self.directory_package_file(name)
+            if file:
+                yield file
+
+    def all_package_files(self):
+        """
+        Returns the package.env files of all packages, sorted by name.
+        """
+        return list(self.iter_package_files())
+
+    def virtual_file(self, name):
+        if name in self.listing(self.virtual_path):
+            return self.virtual_path + name
+        return None
+
+    def virtual_files(self, sort=True):
+        names = self.scan(self.virtual_path)
+        if sort:
+            names = sorted(names)
+        return [self.virtual_path + name for name in names if not name.startswith('.')]
+
+    def vm_files(self):
+        return [os.path.join(self.vms_path, name) for name in sorted(self.listing(self.vms_path))]
+
+# vim:set expandtab tabstop=4 shiftwidth=4 softtabstop=4 nowrap:
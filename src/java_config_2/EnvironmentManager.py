@@ -2,31 +2,114 @@
 # Copyright 2004-2013 Gentoo Foundation
 # Distributed under the terms of the GNU General Public License v2
 
-from .OutputFormatter import *
-from .Package import *
-from .Virtual import *
-from .VM import *
-from .Errors import *
-from itertools import chain
-
-import sys
-import re
+from .OutputFormatter import OutputFormatter
+from .FileParser import EnvFileParser
+from .Package import Package
+from .Virtual import Virtual
+from .VM import VM
+from .Errors import EnvironmentUndefinedError, InvalidConfigError, InvalidVMError, PermissionError, ProviderUnavailableError, UnexistingPackageError
+from .Cache import ConfigCache, ResolutionCache
+from .DependencyGraph import DependencyGraph
+from .PathBuilder import PathBuilder
+from .VMRegistry import VMRegistry
+from .ProviderMatrix import ProviderMatrix
+from .DirectoryIndex import DirectoryIndex
+from .EnvironmentSnapshot import EnvironmentSnapshot
+from . import Trace
+
 import os
 
 from os.path import basename, dirname
-from glob import glob
+
+
+class _NoLock(object):
+    """
+    Stands in for the locks of a manager which is not shared by threads.
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+_no_lock = _NoLock()
+
+
+class _Scope(object):
+    """
+    Holds the vm of the using_vm block of a manager which is not
+    shared by threads, the others use a threading.local.
+    """
+    vm = None
+
+
+class _ScopedVM(object):
+    """
+    Makes vm the active vm of the current thread for a with block.
+    """
+    __slots__ = ('scope', 'vm', 'saved')
+
+    def __init__(self, scope, vm):
+        self.scope = scope
+        self.vm = vm
+        self.saved = None
+
+    def __enter__(self):
+        self.saved = getattr(self.scope, 'vm', None)
+        if self.vm is not None:
+            self.scope.vm = self.vm
+        return self.vm
+
+    def __exit__(self, *exc_info):
+        self.scope.vm = self.saved
+        return False
 
 
 class EnvironmentManager(object):
-    """This is the central class, which manages all information from the 'environment'"""
+    """
+    This is the central class, which manages all information from the 'environment'
 
-    def __init__(self, root='', eprefix=''):
+    A manager created with threadsafe=True can be shared by threads:
+    everything is loaded once, however many threads ask for it at the
+    same time, and using_vm and the vm arguments of the build_*
+    methods choose the vm of one thread without changing the active
+    vm of the others.
+    """
+
+    # Below this number of files loading them in parallel is not worth it
+    parallel_threshold = 64
+
+    # Number of threads used to load env files unless JAVA_CONFIG_THREADS says otherwise
+    default_threads = 8
+
+    def __init__(self, root='', eprefix='', use_cache=False, threads=None, threadsafe=False):
         self.all_packages_loaded = False
         self.packages = {}
         self.virtuals = {}
         self.virtuals_pref = None
+        # Provider packages and vms of the virtuals, see Virtual.resolve
+        self.virtual_providers = {}
         self.virtual_machines = None
-        self.active_vm = None
+        self.vm_registry = None
+        self.provider_matrix = None
+        self.directory_index = None
+        self._active_vm = None
+        # (vm, DependencyGraph) for every vm a graph was needed for
+        self.dependency_graphs = []
+
+        self.threadsafe = threadsafe
+        if threadsafe:
+            import threading
+            self.lock = threading.RLock()
+            self.new_lock = threading.RLock
+            self._scope = threading.local()
+        else:
+            self.lock = _no_lock
+            self.new_lock = None
+            self._scope = _Scope()
+        # The locks of the packages and virtuals being loaded, see key_lock
+        self.key_locks = {}
 
         self.eprefix = eprefix
         self.eroot = root + eprefix
@@ -39,72 +122,228 @@ class EnvironmentManager(object):
 
         self.system_config_path = self.eroot + "/etc/java-config-2/"
 
+        # Location of the persistent caches
+        self.cache_path = self.eroot + '/var/cache/java-config-2/'
+
+        self.config_cache = None
+        self.resolution_cache = None
+        if use_cache:
+            self.config_cache = ConfigCache(self.cache_path + 'config.cache')
+            self.resolution_cache = ResolutionCache(self.cache_path + 'resolution.cache')
+
+        # Number of threads used to load env files, 1 disables threading
+        if threads is None:
+            try:
+                threads = int(os.getenv('JAVA_CONFIG_THREADS', self.default_threads))
+            except ValueError:
+                threads = self.default_threads
+        self.threads = max(threads, 1)
+
+    def map_files(self, function, files):
+        """
+        Call function for every file and return the results in the
+        same order. Loading files is mostly waiting for I/O, so large
+        numbers of them are handled by a pool of threads.
+        """
+        if self.threads > 1 and len(files) >= self.parallel_threshold:
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(self.threads) as pool:
+                return list(pool.map(function, files))
+        return [function(file) for file in files]
+
+    def key_lock(self, key):
+        """
+        Returns the lock to hold while loading the thing named by key,
+        e.g. ('package', name), so that it is only loaded once.
+        """
+        if not self.threadsafe:
+            return _no_lock
+        lock = self.key_locks.get(key)
+        if lock is None:
+            lock = self.key_locks.setdefault(key, self.new_lock())
+        return lock
+
+    @property
+    def active_vm(self):
+        """
+        The vm of the current using_vm block, or the vm set by
+        set_active_vm or load_active_vm.
+        """
+        vm = getattr(self._scope, 'vm', None)
+        if vm is None:
+            return self._active_vm
+        return vm
+
+    @active_vm.setter
+    def active_vm(self, vm):
+        self._active_vm = vm
+
+    @Trace.traced('load_vms')
     def load_vms(self):
         """Load all the vm files, and check for correctness"""
-        self.virtual_machines = {}
+        with self.lock:
+            self._load_vms()
 
-        if os.path.isdir(self.vms_path):
-            count = 1
-            filelist = os.listdir(self.vms_path)
-            filelist.sort()
-            for file in filelist:
-                conf = os.path.join(self.vms_path,file)
-                vm = None
+    def _load_vms(self):
+        virtual_machines = {}
 
-                try:
-                    vm = VM(conf)
-                except (InvalidConfigError, PermissionError):
+        def load_vm(conf):
+            # Keep the active vm found by load_active_vm, see find_active_vm
+            if self.active_vm is not None and self.active_vm.filename() == conf:
+                return self.active_vm
+            try:
+                return VM(conf, self.config_cache)
+            except (InvalidConfigError, PermissionError):
+                return None
+            except InvalidVMError as ex:
+                return ex
+
+        conflist = self.get_directory_index().vm_files()
+        if conflist:
+            count = 1
+            for conf, vm in zip(conflist, self.map_files(load_vm, conflist)):
+                if vm is None:
                     continue
-                except InvalidVMError as ex:
+                if isinstance(vm, InvalidVMError):
                     printer = OutputFormatter()
-                    printer._printAlert("Invalid vm configuration file found: %s\nJava-config 2 requires some new variables, please update all your jdk/jre:  file\n(%s)" % ( conf, ex ))
+                    printer._printAlert("Invalid vm configuration file found: %s\nJava-config 2 requires some new variables, please update all your jdk/jre:  file\n(%s)" % ( conf, vm ))
                     continue
 
-                self.virtual_machines[count] = vm
+                virtual_machines[count] = vm
                 count += 1
 
+        # Other threads only see the vms once all of them are loaded
+        self.virtual_machines = virtual_machines
+        self.vm_registry = VMRegistry(virtual_machines)
+        self.provider_matrix = None
+        self.virtual_providers = {}
+
+    def get_directory_index(self):
+        if self.directory_index is None:
+            with self.lock:
+                if self.directory_index is None:
+                    self.directory_index = DirectoryIndex(self)
+        return self.directory_index
+
+    @Trace.traced('load_package')
     def load_package(self, name):
+        name = name.replace(':', '-')
+        index = self.get_directory_index()
+        if name in index.missing:
+            raise UnexistingPackageError(name)
+
         try:
-            name = name.replace(':', '-')
-            pkg = Package(name, sorted (glob (self.pkg_path % name ), reverse=True)[0])
-            self.packages[name] = pkg
-            return pkg
-        except (IndexError, InvalidConfigError):
+            file = index.package_file(name)
+            if file:
+                pkg = Package(name, file, self.config_cache)
+                pkg.parse()
+                # load_packages may have added it in the meantime
+                with self.lock:
+                    pkg = self.packages.setdefault(name, pkg)
+                Trace.count('packages loaded')
+                return pkg
+        except InvalidConfigError:
+            pass
+
+        #Try load Virtual instead of Package.
+        file = index.virtual_file(name)
+        if file:
             try:
-                #Try load Virtual instead of Package.
-                pkg = Virtual( name, self, self.virtual_path + name )
-                self.packages[name] = pkg
-                self.virtuals[name] = pkg
+                pkg = Virtual( name, self, file )
+                with self.lock:
+                    pkg = self.packages.setdefault(name, pkg)
+                    self.virtuals.setdefault(name, pkg)
                 return pkg
             except InvalidConfigError:
-                raise UnexistingPackageError(name)
+                pass
 
-    def load_packages(self):
-        for package in iter(glob(self.pkg_path % "*" )):
-            name = basename(dirname(package))
-            if name in self.packages:
-                continue
-            self.packages[name] = Package(name, package)
+        index.missing.add(name)
+        raise UnexistingPackageError(name)
 
+    @Trace.traced('load_packages')
+    def load_packages(self):
+        with self.lock:
+            self._load_packages()
+
+    def _load_packages(self):
+        files = [package for package in self.get_directory_index().all_package_files()
+                 if basename(dirname(package)) not in self.packages]
+        # The env files are read on first use, see parse_packages.
+        # Packages loaded by get_package since the check above are kept.
+        for package in files:
+            pkg = Package(basename(dirname(package)), package, self.config_cache)
+            self.packages.setdefault(pkg.name(), pkg)
+        Trace.count('packages loaded', len(files))
+
+        files = self.get_directory_index().virtual_files()
+        load_virtual = lambda virtual: Virtual(basename(virtual), self, virtual)
+        for virt in self.map_files(load_virtual, files):
+            virt = self.packages.setdefault(virt.name(), virt)
+            self.virtuals.setdefault(virt.name(), virt)
+
+        # Set last, get_package stops looking for packages not loaded yet
         self.all_packages_loaded = True
+        self.invalidate_dependency_graphs()
+        self.provider_matrix = None
+
+    @Trace.traced('parse_packages')
+    def parse_packages(self, packages=None):
+        """
+        Read the env files of the given packages, or of all loaded
+        packages, which have not been read yet. Use this before
+        querying many packages, as it reads them in parallel.
+        """
+        if packages is None:
+            packages = list(self.packages.values())
+        unparsed = [pkg for pkg in packages if not pkg.is_parsed()]
+        self.map_files(lambda pkg: pkg.parse(), unparsed)
 
-        for virtual in iter(glob(self.virtual_path + '*')):
-            virt = Virtual(basename(virtual), self, virtual)
-            self.packages[virt.name()] = virt
-            self.virtuals[virt.name()] = virt
+    def iter_packages(self, sort=True):
+        """
+        Yields all packages and then all virtuals, sorted by name or in
+        the order the directories are read, without loading all of them
+        first. Packages which are not loaded yet are read a chunk at a
+        time and are not kept in the manager.
+        """
+        index = self.get_directory_index()
+        chunk = []
+        for file in index.iter_package_files(sort):
+            name = basename(dirname(file))
+            pkg = self.packages.get(name)
+            if pkg is None:
+                pkg = Package(name, file, self.config_cache)
+            chunk.append(pkg)
+            if len(chunk) >= self.parallel_threshold:
+                self.parse_packages(chunk)
+                for pkg in chunk:
+                    yield pkg
+                chunk = []
+        self.parse_packages(chunk)
+        for pkg in chunk:
+            yield pkg
+
+        for file in index.virtual_files(sort):
+            name = basename(file)
+            pkg = self.packages.get(name)
+            if pkg is None:
+                pkg = Virtual(name, self, file)
+            yield pkg
 
     def get_virtuals_pref(self):
         if self.virtuals_pref is None:
-            self.load_virtuals_pref()
+            with self.lock:
+                if self.virtuals_pref is None:
+                    self.load_virtuals_pref()
         return self.virtuals_pref
 
     def load_virtuals_pref(self):
         self.virtuals_pref = EnvFileParser(self.system_config_path + "virtuals")
 
+    @Trace.traced('load_active_vm')
     def load_active_vm(self):
         vm_name = os.getenv("GENTOO_VM")
         if vm_name:
-            vm = self.get_vm(vm_name)
+            vm = self.find_active_vm(vm_name)
             if vm:
                 self.active_vm = vm
                 return vm
@@ -112,43 +351,74 @@ class EnvironmentManager(object):
         for link in self.vm_links():
             if os.path.islink(link):
                 vm_name = basename(os.readlink(link))
-                vm = self.get_vm(vm_name)
+                vm = self.find_active_vm(vm_name)
                 if vm:
                     self.active_vm = vm
                     return vm
         raise InvalidVMError("Unable to determine valid Java VM!")
 
+    def find_active_vm(self, vm_name):
+        """
+        Returns the vm named vm_name like get_vm. Most of the time it is
+        the name of a vm env file, and that file is all we need to read
+        to answer queries about the active vm. Anything else falls back
+        to loading all vms.
+        """
+        if self.vm_registry is None and '/' not in vm_name and not vm_name.isdigit():
+            file = os.path.join(self.vms_path, vm_name)
+            if os.path.isfile(file):
+                try:
+                    return VM(file, self.config_cache)
+                except (InvalidConfigError, InvalidVMError, PermissionError):
+                    pass
+        return self.get_vm(vm_name)
+
     def set_active_vm(self, vm):
         self.active_vm = vm
 
     def get_active_vm(self):
         if self.active_vm is None:
-            self.load_active_vm()
+            with self.lock:
+                if self.active_vm is None:
+                    self.load_active_vm()
         return self.active_vm
 
+    def using_vm(self, vm):
+        """
+        Returns a context manager which makes vm the active vm of the
+        current thread inside its with block. Does nothing if vm is None.
+        """
+        return _ScopedVM(self._scope, vm)
+
     def get_virtual_machines(self):
-        if self.virtual_machines is None:
-            self.load_vms()
+        if self.vm_registry is None:
+            with self.lock:
+                if self.vm_registry is None:
+                    self.load_vms()
         return self.virtual_machines
 
+    def get_vm_registry(self):
+        if self.vm_registry is None:
+            with self.lock:
+                if self.vm_registry is None:
+                    self.load_vms()
+        return self.vm_registry
+
     def find_vm(self, name):
-        found = []
-        for id, vm in self.get_virtual_machines().items():
-            # match either exact given string or the unversioned part - bug #288695
-            if not name or len(name) == 0:
-                found.append(vm)
-            elif vm.name() == name:
-                found.append(vm)
-            elif vm.name() == (name + "-" + vm.version()):
-                found.append(vm)
-        return found
+        # match either exact given string or the unversioned part - bug #288695
+        return self.get_vm_registry().find(name)
 
     def get_package(self, pkgname):
         try:
             return self.packages[pkgname]
         except KeyError:
             if not self.all_packages_loaded:
-                return self.load_package(pkgname)
+                # Threads asking for the same package wait for the first one
+                with self.key_lock(('package', pkgname)):
+                    pkg = self.packages.get(pkgname.replace(':', '-'))
+                    if pkg is not None:
+                        return pkg
+                    return self.load_package(pkgname)
 
     def get_packages(self):
         """
@@ -157,7 +427,9 @@ class EnvironmentManager(object):
         the list of packages directly.
         """
         if not self.all_packages_loaded:
-            self.load_packages()
+            with self.lock:
+                if not self.all_packages_loaded:
+                    self.load_packages()
         return self.packages
 
     def get_virtuals(self):
@@ -183,36 +455,7 @@ class EnvironmentManager(object):
         return results
 
     def get_vm(self, machine):
-        vm_list = self.get_virtual_machines()
-        selected = None
-
-        for count in iter(vm_list):
-            vm = vm_list[count]
-
-            if str(machine).isdigit():
-                if int(machine) is count:
-                    return vm
-            else:
-                # Check if the vm is specified via env file
-                if machine == vm.filename():
-                    return vm
-
-                # Check if the vm is specified by name
-                if machine == vm.name():
-                    return vm
-
-                # Check if the vm is specified via JAVA_HOME
-                if machine == vm.query('JAVA_HOME'):
-                    return vm
-
-                # Check if vm is specified by partial name
-                if vm.name().startswith(machine):
-                    selected = vm
-
-        if selected:
-            return selected
-        else:
-            return None
+        return self.get_vm_registry().get(machine)
 
     def create_env_entry(self, vm, stream, render="%s=%s\n"):
         stream.write("# Autogenerated by java-config\n")
@@ -249,17 +492,15 @@ class EnvironmentManager(object):
             return None
 
     def add_path_elements(self, elements, path):
-        if elements:
-            for p in elements.split(':'):
-                if p != '' and p not in path:
-                    path.append(p)
+        path.extend(elements)
 
-    def build_path(self, pkgs, query):
-        path = []
-        for lpath in self.query_packages(pkgs, query):
-            self.add_path_elements(lpath, path)
+    def build_path(self, pkgs, query, vm=None):
+        path = PathBuilder()
+        with self.using_vm(vm):
+            for lpath in self.query_packages(pkgs, query):
+                self.add_path_elements(lpath, path)
 
-        return path
+        return path.list()
 
     def get_pkg_deps(self, pkg):
         """
@@ -287,6 +528,29 @@ class EnvironmentManager(object):
                     continue
         return deps
 
+    def get_dependency_graph(self):
+        """
+        Returns the DependencyGraph for the active vm, as the providers
+        of virtuals depend on it.
+        """
+        vm = self.active_vm
+        with self.lock:
+            # VMs compare by version, look for the vm itself
+            for other, graph in self.dependency_graphs:
+                if other is vm:
+                    return graph
+            graph = DependencyGraph(self)
+            self.dependency_graphs.append((vm, graph))
+            return graph
+
+    def invalidate_dependency_graphs(self):
+        """
+        Forgets the dependency graphs of all vms, they are built again
+        when they are needed.
+        """
+        with self.lock:
+            self.dependency_graphs = []
+
     def add_dep_classpath(self, pkg, dep, classpath):
         pkg_cp = pkg.classpath()
         if pkg_cp:
@@ -294,42 +558,39 @@ class EnvironmentManager(object):
                 self.add_path_elements(pkg_cp, classpath)
             else:
                 for cp in pkg_cp.split(':'):
-                    if basename(cp) == dep[0] and cp not in classpath:
-                        classpath.append(cp)
-
-    def build_dep_path(self, pkgs, query, missing_deps):
-        path = []
-
-        unresolved = set()
-        resolved = set()
-
-        for p in pkgs[:]:
-            pkg = self.get_package(p)
-            if pkg:
-                pkgs.remove(p)
-                lpath = pkg.query(query)
-                self.add_path_elements(lpath, path)
-                unresolved.add(pkg)
+                    if basename(cp) == dep[0]:
+                        classpath.add(cp)
 
-        while len(unresolved) > 0:
-            pkg = unresolved.pop()
-            resolved.add(pkg)
-
-            if query != "CLASSPATH":
-                lpath = pkg.query(query)
-                self.add_path_elements(lpath, path)
-            for dep in self.get_pkg_deps(pkg):
-                p = self.get_package(dep[-1])
-
-                if p:
-                    if p not in resolved:
-                        unresolved.add(p)
-                    if query == "CLASSPATH":
+    @Trace.traced('dependency walk')
+    def build_dep_path(self, pkgs, query, missing_deps, vm=None):
+        """
+        Returns the entries of query of the packages in list `pkgs`
+        and their dependencies, as seen by vm or the active vm.
+        """
+        path = PathBuilder()
+        roots = []
+
+        with self.using_vm(vm):
+            for p in pkgs[:]:
+                pkg = self.get_package(p)
+                if pkg:
+                    pkgs.remove(p)
+                    lpath = pkg.query(query)
+                    self.add_path_elements(lpath, path)
+                    roots.append(pkg)
+
+            graph = self.get_dependency_graph()
+            for pkg in graph.walk(roots):
+                if query != "CLASSPATH":
+                    lpath = pkg.query(query)
+                    self.add_path_elements(lpath, path)
+                for dep, p in graph.edges(pkg):
+                    if p is None:
+                        missing_deps.add(dep[-1])
+                    elif query == "CLASSPATH":
                         self.add_dep_classpath(p, dep, path)
-                else:
-                    missing_deps.add(dep[-1])
 
-        return path
+        return path.list()
 
     def add_pkg_env_vars(self, pkg, env):
         """
@@ -344,61 +605,64 @@ class EnvironmentManager(object):
                 if (var not in env):
                     env[var] = val
 
-    def build_dep_env_vars(self, pkgs, missing_deps):
+    @Trace.traced('dependency walk')
+    def build_dep_env_vars(self, pkgs, missing_deps, vm=None):
         """
         Returns a dictionary of variables declared via ENV_VARS in
         package.env of all packages in list `pkgs` and all dependencies.
         Encountered missing dependencies are recorded in `missing_deps`.
         """
         env = {}
+        roots = []
 
-        unresolved = set()
-        resolved = set()
+        with self.using_vm(vm):
+            for p in pkgs[:]:
+                pkg = self.get_package(p)
+                if pkg:
+                    if hasattr(pkg, 'is_vm') and pkg.is_vm():
+                        continue
+                    pkgs.remove(p)
+                    roots.append(pkg)
 
-        for p in pkgs:
-            pkg = self.get_package(p)
-            if pkg:
+            graph = self.get_dependency_graph()
+            for pkg in graph.walk(roots):
                 if hasattr(pkg, 'is_vm') and pkg.is_vm():
                     continue
-                pkgs.remove(p)
-                unresolved.add(pkg)
-
-        while len(unresolved) > 0:
-            pkg = unresolved.pop()
-            resolved.add(pkg)
-
-            self.add_pkg_env_vars(pkg, env)
-
-            for dep in self.get_pkg_deps(pkg):
-                p = self.get_package(dep[-1])
-
-                if p:
-                    if p not in resolved:
-                        if hasattr(p, 'is_vm') and p.is_vm():
-                            continue
-                        unresolved.add(p)
-                else:
-                    missing_deps.add(dep[-1])
+                self.add_pkg_env_vars(pkg, env)
+                for dep, p in graph.edges(pkg):
+                    if p is None:
+                        missing_deps.add(dep[-1])
         return env
 
+    def get_provider_matrix(self):
+        if self.provider_matrix is None:
+            with self.lock:
+                if self.provider_matrix is None:
+                    self.provider_matrix = ProviderMatrix(self)
+        return self.provider_matrix
+
     def have_provider(self, virtuals, virtualMachine, versionManager):
-        result=True
-        storeVM = self.get_active_vm()
-        self.set_active_vm(virtualMachine)
-        try:
-            for virtualKey in virtuals.split():
-                if self.get_package(virtualKey):
-                    try:
-                        self.get_package(virtualKey).get_provider().classpath()
-                        result= (result and True)
-                        continue
-                    except AttributeError:
-                        if not self.get_package(virtualKey).get_available_vms().count(virtualMachine.name()) > 0:
-                            result = False
-                        else:
-                            result=result and True
-        finally:
-            self.set_active_vm(storeVM)
-        return result
+        matrix = self.get_provider_matrix()
+        return matrix.provides(matrix.satisfying(virtuals), virtualMachine)
+
+    def snapshot(self):
+        """
+        Loads and reads all vms and packages, works out the providers
+        of all virtuals, and returns them as an EnvironmentSnapshot
+        which does not change when this manager does.
+        """
+        with self.lock:
+            virtual_machines = self.get_virtual_machines()
+            registry = self.get_vm_registry()
+            self.get_packages()
+            packages = dict(self.packages)
+            virtuals = dict(self.virtuals)
+        self.parse_packages(list(packages.values()))
+        for virtual in virtuals.values():
+            try:
+                virtual.resolve()
+            except ProviderUnavailableError:
+                pass
+        return EnvironmentSnapshot(packages, virtuals, virtual_machines, registry, self.active_vm)
 
 # vim:set expandtab tabstop=4 shiftwidth=4 softtabstop=4 nowrap:
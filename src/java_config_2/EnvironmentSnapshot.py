@@ -0,0 +1,67 @@
+# -*- coding: UTF-8 -*-
+# Copyright 2004-2013 Gentoo Foundation
+# Distributed under the terms of the GNU General Public License v2
+
+from .Errors import UnexistingPackageError
+
+from types import MappingProxyType
+
+
+class EnvironmentSnapshot(object):
+    """
+    The vms and packages of an EnvironmentManager at one point in time,
+    see EnvironmentManager.snapshot. The env files of all of them are
+    read, and the mappings can not be changed, so threads can look
+    things up without any locking. Packages and vms installed later,
+    or loaded again by the manager, do not show up.
+
+    The packages themselves are those of the manager. The providers of
+    the virtuals are worked out when the snapshot is taken, but which
+    of them a virtual uses, and so its classpath, still follows the
+    active vm of the manager.
+    """
+    __slots__ = ('packages', 'virtuals', 'virtual_machines', 'vm_registry', 'active_vm')
+
+    def __init__(self, packages, virtuals, virtual_machines, vm_registry, active_vm=None):
+        object.__setattr__(self, 'packages', MappingProxyType(packages))
+        object.__setattr__(self, 'virtuals', MappingProxyType(virtuals))
+        object.__setattr__(self, 'virtual_machines', MappingProxyType(dict(virtual_machines)))
+        object.__setattr__(self, 'vm_registry', vm_registry)
+        object.__setattr__(self, 'active_vm', active_vm)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("EnvironmentSnapshot can not be changed")
+
+    def __delattr__(self, name):
+        raise AttributeError("EnvironmentSnapshot can not be changed")
+
+    def get_package(self, name):
+        try:
+            return self.packages[name.replace(':', '-')]
+        except KeyError:
+            raise UnexistingPackageError(name)
+
+    def get_packages(self):
+        return self.packages
+
+    def get_virtuals(self):
+        return self.virtuals
+
+    def get_virtual_machines(self):
+        return self.virtual_machines
+
+    def get_vm(self, machine):
+        return self.vm_registry.get(machine)
+
+    def find_vm(self, name):
+        return self.vm_registry.find(name)
+
+    def query_packages(self, packages, query):
+        results = []
+        for package in packages:
+            value = self.get_package(package).query(query)
+            if value:
+                results.append(value)
+        return results
+
+# vim:set expandtab tabstop=4 shiftwidth=4 softtabstop=4 nowrap:
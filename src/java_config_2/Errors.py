@@ -39,10 +39,28 @@ class ProviderUnavailableError(Exception):
 Please check your your environment""" % (self._virtual)
 
 
+class MissingDependencyError(Exception):
+    """Dependencies of the packages are not installed."""
+    def __init__(self, missing):
+        self.missing = sorted(missing)
+        self.package = self.missing[0]
+
+    def __str__(self):
+        return "Dependency packages not found: %s" % ', '.join(self.missing)
+
+
+class NoSuitableVMError(Exception):
+    """No virtual machine satisfies the dependency string."""
+
+
 class PermissionError(Exception):
     """File permissions are wrong or you are not a privileged user."""
 
 
+class ServerUnavailableError(Exception):
+    """The java-config server is not running or refused to answer."""
+
+
 class UnexistingPackageError(Exception):
     """Package does not exist."""
     def __init__(self, package):
@@ -51,4 +69,43 @@ class UnexistingPackageError(Exception):
     def __str__(self):
         return "Package %s was not found!" % self.package
 
+
+def encode_error(error):
+    """
+    Turn an exception into plain data which decode_error can
+    turn into an exception again, e.g. for the java-config server.
+    """
+    data = {'type': error.__class__.__name__, 'message': str(error)}
+    if hasattr(error, 'package'):
+        data['package'] = error.package
+    if hasattr(error, 'file'):
+        data['file'] = error.file
+    if hasattr(error, 'missing'):
+        data['missing'] = error.missing
+    if hasattr(error, 'virtual') and hasattr(error, 'vms'):
+        data['virtual'] = error.virtual()
+        data['vms'] = error.vms()
+        data['packages'] = error.packages()
+    return data
+
+
+def decode_error(data):
+    """
+    Rebuild an exception encoded by encode_error.
+    """
+    name = data['type']
+    if name == 'UnexistingPackageError':
+        return UnexistingPackageError(data['package'])
+    if name == 'InvalidConfigError':
+        return InvalidConfigError(data['file'])
+    if name == 'ProviderUnavailableError':
+        return ProviderUnavailableError(data['virtual'], data['vms'], data['packages'])
+    if name == 'MissingDependencyError':
+        return MissingDependencyError(data['missing'])
+    if name in ('EnvironmentUndefinedError', 'InvalidVMError', 'NoSuitableVMError', 'PermissionError'):
+        return globals()[name](data['message'])
+    if name == 'ValueError':
+        return ValueError(data['message'])
+    return Exception(data['message'])
+
 # vim:set expandtab tabstop=4 shiftwidth=4 softtabstop=4 nowrap:
\ No newline at end of file
@@ -0,0 +1,61 @@
+# -*- coding: UTF-8 -*-
+# Copyright 2004-2013 Gentoo Foundation
+# Distributed under the terms of the GNU General Public License v2
+
+import os
+import tempfile
+
+try:
+    # Python 3.
+    from shlex import quote
+except ImportError:
+    # Python 2.
+    from pipes import quote
+
+
+class LaunchPlan(object):
+    """
+    A shell sourceable file holding the output of gjl for a package,
+    so launcher.bash can skip calling gjl as long as none of the
+    files it was computed from changed.
+
+    The file only assigns gjl_plan_key, gjl_plan_files and
+    gjl_plan_results. launcher.bash sources it, compares the key with
+    the one it computed for the current run and checks that none of
+    gjl_plan_files is missing or newer than the plan itself before
+    evaluating the results.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def write(self, key, results, files, mtime):
+        """
+        Write the plan and give it the modification time `mtime`,
+        which should be the time at which computing the results started,
+        so changes made to the files while gjl was running invalidate it.
+        """
+        directory = os.path.dirname(self.path)
+        try:
+            if not os.path.isdir(directory):
+                os.makedirs(directory)
+            fd, tmp = tempfile.mkstemp(dir=directory, prefix='.plan-')
+            try:
+                with os.fdopen(fd, 'w') as stream:
+                    stream.write("# Autogenerated by gjl\n")
+                    stream.write("gjl_plan_key=%s\n" % quote(key))
+                    stream.write("gjl_plan_files=(\n")
+                    for file in sorted(set(files)):
+                        stream.write("\t%s\n" % quote(file))
+                    stream.write(")\n")
+                    stream.write("gjl_plan_results=%s\n" % quote(results))
+                os.utime(tmp, (mtime, mtime))
+                os.rename(tmp, self.path)
+            except:
+                os.unlink(tmp)
+                raise
+        except (IOError, OSError):
+            return False
+        return True
+
+# vim:set expandtab tabstop=4 shiftwidth=4 softtabstop=4 nowrap:
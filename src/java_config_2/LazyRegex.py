@@ -0,0 +1,25 @@
+# -*- coding: UTF-8 -*-
+# Copyright 2004-2013 Gentoo Foundation
+# Distributed under the terms of the GNU General Public License v2
+
+
+class LazyRegex(object):
+    """
+    A regular expression which is only compiled, and re only imported,
+    the first time it is used, keeping it out of the startup of the
+    commands which never need it.
+    """
+
+    __slots__ = ('pattern', 'compiled')
+
+    def __init__(self, pattern):
+        self.pattern = pattern
+        self.compiled = None
+
+    def __getattr__(self, name):
+        if self.compiled is None:
+            import re
+            self.compiled = re.compile(self.pattern)
+        return getattr(self.compiled, name)
+
+# vim:set expandtab tabstop=4 shiftwidth=4 softtabstop=4 nowrap:
@@ -26,6 +26,14 @@ class OutputFormatter:
               '%': '%'                # Percent
              }
 
+    # What %<char> turns into with and without colors. A % followed
+    # by a space is kept as it is.
+    colorCodes = dict(codes, **{' ': '% '})
+    stripCodes = dict([(char, '') for char in codes], **{'%': '%', ' ': '% '})
+
+    # Number of lines written at once by _printLines
+    chunkLines = 256
+
     def __init__(self, displayColor=True, displayTitle=True, autoIndent=True):
         self.colorOutput = displayColor
         self.autoIndent = autoIndent
@@ -45,31 +53,28 @@ class OutputFormatter:
             return prefix + message
 
     def __parseColor(self, message):
-        colored = ''
-        striped = ''
-        replace = 0
-
-        for char in str(message):
-            if replace:
-                if char == ' ':
-                    colored += self.codes['%'] + ' '
-                    striped += self.codes['%'] + ' '
-                elif char == '%':
-                    colored += self.codes[char]
-                    striped += self.codes[char]
-                else:
-                    colored += self.codes[char]
-                replace = 0
-            elif char == '%':
-                replace = 1
-            else:
-                colored += char
-                striped += char
+        message = str(message)
+        if '%' not in message:
+            return message
 
         if self.colorOutput:
-            return colored
+            codes = self.colorCodes
         else:
-            return striped
+            codes = self.stripCodes
+
+        parts = []
+        start = 0
+        end = len(message)
+        while start < end:
+            index = message.find('%', start)
+            if index < 0:
+                parts.append(message[start:])
+                break
+            parts.append(message[start:index])
+            if index + 1 < end:
+                parts.append(codes[message[index + 1]])
+            start = index + 2
+        return ''.join(parts)
 
     def write(self, message):
         print(self.__parseColor(message.strip()))
@@ -77,6 +82,28 @@ class OutputFormatter:
     def _print(self, message):
         print(self.__parseColor(message))
 
+    def _printLines(self, messages, stream=None):
+        """
+        Print every message of the iterable messages, writing them to
+        stream (stdout by default) in chunks rather than line by line.
+        """
+        if stream is None:
+            stream = sys.stdout
+        lines = []
+        try:
+            for message in messages:
+                lines.append(self.__parseColor(message))
+                if len(lines) >= self.chunkLines:
+                    lines.append('')
+                    stream.write('\n'.join(lines))
+                    lines = []
+        finally:
+            # Whatever was printed before an error
+            if lines:
+                lines.append('')
+                stream.write('\n'.join(lines))
+            stream.flush()
+
     def _printError(self, message):
         message = "%H%R" + self.__indent("!!! ERROR: ", message) + "%$"
         sys.stderr.write(self.__parseColor(message) + '\n')
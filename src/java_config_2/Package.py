@@ -2,19 +2,43 @@
 # Copyright 2004-2013 Gentoo Foundation
 # Distributed under the terms of the GNU General Public License v2
 
-from .FileParser import *
+from .FileParser import EnvFileParser
+from . import Trace
 
-class Package:
+class Package(object):
     """
     The Package class represents an installed Java package.
+    The env file is only read when something is queried.
     """
-    def __init__(self, name, file = None):
+    __slots__ = ('_name', '_file', '_cache', '_parsed')
+
+    def __init__(self, name, file = None, cache = None):
         self._file = file
         self._name = name
-        if self._file:
-            self._config = EnvFileParser(file).get_config()
-        else:
-            self._config = {}
+        self._cache = cache
+        self._parsed = None
+        if not self._file:
+            self._parsed = {}
+
+    def parse(self):
+        """
+        Reads the env file unless this has been done before and
+        returns a read-only view of its variables.
+        """
+        if self._parsed is None:
+            Trace.count('packages parsed')
+            if self._cache:
+                self._parsed = self._cache.get_config(self._file)
+            else:
+                self._parsed = EnvFileParser(self._file).get_config()
+        return self._parsed
+
+    def is_parsed(self):
+        return self._parsed is not None
+
+    @property
+    def _config(self):
+        return self.parse()
 
     def __str__(self):
         return self.name()
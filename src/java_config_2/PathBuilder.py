@@ -0,0 +1,67 @@
+# -*- coding: UTF-8 -*-
+# Copyright 2004-2013 Gentoo Foundation
+# Distributed under the terms of the GNU General Public License v2
+
+import os
+
+
+def normpath(mypath):
+    newpath = os.path.normpath(mypath)
+    if newpath.startswith('//'):
+        return newpath[1:]
+    return newpath
+
+
+class PathBuilder(object):
+    """
+    Accumulates the elements of a CLASSPATH or LIBRARY_PATH.
+    Elements keep the order in which they were first added, later
+    additions of the same element, after normalization, are dropped.
+    """
+
+    def __init__(self, elements=None):
+        self._elements = []
+        self._seen = set()
+        if elements:
+            self.extend(elements)
+
+    def add(self, element):
+        """
+        Append element unless it is empty or already in the path.
+        Returns True if it was appended.
+        """
+        if not element:
+            return False
+        key = normpath(element)
+        if key in self._seen:
+            return False
+        self._seen.add(key)
+        self._elements.append(element)
+        return True
+
+    def extend(self, elements):
+        """
+        Append elements, either a list or a ':' separated string.
+        """
+        if elements:
+            if isinstance(elements, str):
+                elements = elements.split(':')
+            for element in elements:
+                self.add(element)
+
+    def __contains__(self, element):
+        return bool(element) and normpath(element) in self._seen
+
+    def __iter__(self):
+        return iter(self._elements)
+
+    def __len__(self):
+        return len(self._elements)
+
+    def __str__(self):
+        return ':'.join(self._elements)
+
+    def list(self):
+        return list(self._elements)
+
+# vim:set expandtab tabstop=4 shiftwidth=4 softtabstop=4 nowrap:
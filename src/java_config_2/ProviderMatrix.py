@@ -0,0 +1,70 @@
+# -*- coding: UTF-8 -*-
+# Copyright 2004-2013 Gentoo Foundation
+# Distributed under the terms of the GNU General Public License v2
+
+from .Errors import ProviderUnavailableError
+
+
+class ProviderMatrix(object):
+    """
+    Which vms can be used with which virtuals.
+
+    Every virtual gets a row with one bit per vm, the bit of vm number
+    n being 1 << n. A virtual with a package provider can be used with
+    any vm, one which is only provided by vms just with those vms.
+    Rows are worked out on first use and kept until the manager
+    loads its vms or packages again.
+    """
+
+    def __init__(self, manager):
+        self.manager = manager
+        self.registry = manager.get_vm_registry()
+        self.all = 0
+        for number in self.registry.by_number:
+            self.all |= 1 << number
+        self.rows = {}
+
+    def bit(self, vm):
+        number = self.registry.numbers.get(vm.name())
+        if number is None:
+            return 0
+        return 1 << number
+
+    def row(self, name):
+        row = self.rows.get(name)
+        if row is None:
+            row = self.rows[name] = self.load_row(name)
+        return row
+
+    def load_row(self, name):
+        virtual = self.manager.get_package(name)
+        if not virtual or not hasattr(virtual, 'get_available_vms'):
+            return self.all
+        if not virtual.loaded:
+            virtual.load()
+        if virtual.active_package:
+            return self.all
+        if not virtual.get_available_vms():
+            raise ProviderUnavailableError(virtual.name(), ' '.join(virtual.vm_providers), ' '.join(virtual.providers))
+
+        row = 0
+        for vm_name in virtual.get_available_vms():
+            number = self.registry.numbers.get(vm_name)
+            if number is not None:
+                row |= 1 << number
+        return row
+
+    def satisfying(self, virtuals):
+        """
+        Returns the bits of the vms which can be used with all of
+        the space separated virtuals.
+        """
+        vms = self.all
+        for name in virtuals.split():
+            vms &= self.row(name)
+        return vms
+
+    def provides(self, vms, vm):
+        return bool(vms & self.bit(vm))
+
+# vim:set expandtab tabstop=4 shiftwidth=4 softtabstop=4 nowrap:
@@ -0,0 +1,164 @@
+# -*- coding: UTF-8 -*-
+# Copyright 2004-2013 Gentoo Foundation
+# Distributed under the terms of the GNU General Public License v2
+
+from .VersionManager import VersionManager
+from .Errors import InvalidVMError, UnexistingPackageError
+
+import os
+
+
+class QueryHandler(object):
+    """
+    Answers the queries of java-config, gjl and depend-java-query.
+    Queries are identified by name and their arguments and results
+    only consist of plain strings, lists, dicts and booleans so that
+    they can be passed through the java-config server.
+    """
+
+    def __init__(self, manager):
+        self.manager = manager
+        self.verman = VersionManager(manager)
+        self.ops = {
+            'path': self.path,
+            'package-query': self.package_query,
+            'vm-query': self.vm_query,
+            'active-vm': self.active_vm,
+            'launch': self.launch,
+            'get-vm': self.get_vm,
+            'get-lowest': self.get_lowest,
+            'is-sufficient': self.is_sufficient,
+            'parse-depend': self.parse_depend,
+        }
+
+    def query(self, op, vm=None, **args):
+        """
+        Run the query named op. If vm is given, it is used instead of
+        the active vm while answering it, the active vm of the manager
+        does not change.
+        """
+        if op not in self.ops:
+            raise ValueError("Unknown query: %s" % op)
+        active = self.manager.active_vm
+        if vm and not (active and active.filename() == vm):
+            found = self.manager.get_vm(vm)
+            if not found:
+                raise InvalidVMError("No vm matching %s" % vm)
+            with self.manager.using_vm(found):
+                return self.ops[op](**args)
+        return self.ops[op](**args)
+
+    def path(self, packages, query, with_deps=False):
+        missing_deps = set()
+        if with_deps:
+            path = self.manager.build_dep_path(list(packages), query, missing_deps)
+        else:
+            path = self.manager.build_path(list(packages), query)
+        return {'path': list(path), 'missing': sorted(missing_deps)}
+
+    def package_query(self, package, var):
+        pkg = self.manager.get_package(package)
+        if not pkg:
+            raise UnexistingPackageError(package)
+        return {'name': pkg.name(), 'value': pkg.query(var)}
+
+    def vm_query(self, var):
+        return self.manager.get_active_vm().query(var)
+
+    def active_vm(self):
+        return self.manager.get_active_vm().name()
+
+    # The parts of the result of launch which can be asked for
+    launch_fields = ('classpath', 'args', 'files')
+
+    def launch(self, package, get_vm=False, fields=None):
+        """
+        Everything gjl needs to know to start the given package, or
+        the given fields of it: 'classpath' of the package itself,
+        'args' for the dep_classpath, dep_library, missing and env of
+        its dependencies, and 'files' the answer depends on.
+        """
+        if fields is None:
+            fields = self.launch_fields
+        pkg = self.manager.get_package(package)
+        if not pkg:
+            raise UnexistingPackageError(package)
+
+        result = {'vm': None}
+        vm = None
+        if get_vm:
+            vm = self.verman.get_vm(pkg.query('VM'))
+            if vm:
+                result['vm'] = vm.name()
+
+        # The classpath and dependencies are those seen by the vm the package runs on
+        with self.manager.using_vm(vm):
+            if 'classpath' in fields:
+                result['classpath'] = pkg.classpath()
+            if 'args' in fields:
+                missing_deps = set()
+                result['dep_classpath'] = list(self.manager.build_dep_path([pkg.name()], "CLASSPATH", missing_deps))
+                result['dep_library'] = list(self.manager.build_dep_path([pkg.name()], "LIBRARY_PATH", missing_deps))
+                result['missing'] = sorted(missing_deps)
+                result['env'] = self.manager.build_dep_env_vars([pkg.name()], set())
+            if 'files' in fields:
+                result['files'] = self.launch_files(pkg)
+        return result
+
+    def launch_files(self, pkg):
+        """
+        The env files and directories the result of launch depends on:
+        those of the package, its dependencies and virtual providers,
+        all vms and the system and user configuration.
+        """
+        manager = self.manager
+        graph = manager.get_dependency_graph()
+        files = set()
+        seen = set()
+        todo = [pkg]
+        while todo:
+            pkg = todo.pop()
+            if pkg.name() in seen:
+                continue
+            seen.add(pkg.name())
+            if pkg.file():
+                files.add(pkg.file())
+
+            todo += [dep for _, dep in graph.edges(pkg) if dep]
+            if hasattr(pkg, 'get_packages'):
+                for name in pkg.get_packages():
+                    try:
+                        dep = manager.get_package(name)
+                    except UnexistingPackageError:
+                        continue
+                    if dep:
+                        todo.append(dep)
+
+        for vm in manager.get_virtual_machines().values():
+            files.add(vm.filename())
+
+        # Optional dependencies which are not installed yet are
+        # only noticed through new directories in /usr/share.
+        files.update([ manager.eroot + '/usr/share',
+                       manager.vms_path, manager.virtual_path,
+                       manager.system_config_path,
+                       manager.system_config_path + 'virtuals',
+                       self.verman.default_pref_file ])
+        if os.environ.get('HOME'):
+            files.add(os.path.dirname(manager.user_vm_link()))
+        return sorted([file for file in files if os.path.exists(file)])
+
+    def get_vm(self, depend, allow_build_only=False):
+        return self.verman.get_vm(depend, allow_build_only).name()
+
+    def get_lowest(self, depend):
+        return self.verman.get_lowest(depend)
+
+    def is_sufficient(self, depend):
+        return self.verman.version_satisfies(depend, self.manager.get_active_vm())
+
+    def parse_depend(self, depend):
+        return [[atom['equality'], atom['type'], atom['version']]
+                for atom in self.verman.parse_depend(depend)]
+
+# vim:set expandtab tabstop=4 shiftwidth=4 softtabstop=4 nowrap:
@@ -0,0 +1,163 @@
+# -*- coding: UTF-8 -*-
+# Copyright 2004-2013 Gentoo Foundation
+# Distributed under the terms of the GNU General Public License v2
+
+from .EnvironmentManager import EnvironmentManager
+from .QueryHandler import QueryHandler
+from .Client import CLIENT_ENV
+from .Errors import encode_error
+
+import json
+import os
+import socketserver
+import threading
+import time
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    """
+    Reads one JSON encoded request per line and answers each with
+    one JSON encoded response line.
+    """
+
+    def handle(self):
+        for line in self.rfile:
+            try:
+                response = self.server.answer(json.loads(line.decode('utf-8')))
+            except ValueError as e:
+                response = {'status': 'error', 'error': {'type': 'ValueError', 'message': str(e)}}
+            self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+            self.wfile.flush()
+
+
+class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Keeps one resident EnvironmentManager per ROOT/EPREFIX and
+    answers QueryHandler queries for the java-config clients.
+    Every client connection gets its own thread, but queries are
+    answered one at a time.
+
+    A manager is thrown away and rebuilt when one of the directories
+    or env files it was loaded from changes. Env files are only
+    checked every `revalidate` seconds.
+
+    Queries are answered with the CLIENT_ENV of the client, so anyone
+    who can connect decides e.g. which user vm file the server reads.
+    The socket is created with the permissions `mode`, by default only
+    for the user running the server; other users fall back to
+    answering their queries themselves.
+    """
+
+    def __init__(self, path, roots=('',), eprefix='', revalidate=1.0, mode=0o600):
+        self.roots = roots
+        self.eprefix = eprefix
+        self.revalidate = revalidate
+        self.daemon_threads = True
+        self.environments = {}
+        self.lock = threading.Lock()
+
+        if os.path.exists(path):
+            os.unlink(path)
+        directory = os.path.dirname(path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+        socketserver.UnixStreamServer.__init__(self, path, RequestHandler)
+        os.chmod(path, mode)
+
+    def server_close(self):
+        socketserver.UnixStreamServer.server_close(self)
+        try:
+            os.unlink(self.server_address)
+        except OSError:
+            pass
+
+    def watched_files(self, manager):
+        """
+        Everything the manager has loaded so far.
+        """
+        files = [ manager.eroot + '/usr/share', manager.vms_path,
+                  manager.virtual_path, manager.system_config_path,
+                  manager.system_config_path + 'virtuals',
+                  manager.eprefix + '/usr/share/java-config-2/config/jdk-defaults.conf' ]
+        for pkg in list(manager.packages.values()):
+            if pkg.file():
+                files.append(pkg.file())
+        for vm in (manager.virtual_machines or {}).values():
+            files.append(vm.filename())
+        return files
+
+    def is_stale(self, env):
+        """
+        Compare the modification times of all watched files with the
+        ones seen before. Files loaded since the last check are added.
+        """
+        stale = False
+        for file in self.watched_files(env['manager']):
+            try:
+                mtime = os.stat(file).st_mtime
+            except OSError:
+                mtime = None
+            if file not in env['mtimes']:
+                env['mtimes'][file] = mtime
+            elif env['mtimes'][file] != mtime:
+                stale = True
+        return stale
+
+    def get_environment(self, root, eprefix):
+        key = (root, eprefix)
+        env = self.environments.get(key)
+        now = time.time()
+        if env and now - env['checked'] >= self.revalidate:
+            if self.is_stale(env):
+                env = None
+            else:
+                env['checked'] = now
+        if not env:
+            # Packages are loaded on demand and then stay resident.
+            manager = EnvironmentManager(root, eprefix)
+            manager.load_vms()
+            env = { 'manager': manager, 'handler': QueryHandler(manager),
+                    'mtimes': {}, 'checked': now }
+            self.is_stale(env)
+            self.environments[key] = env
+        return env
+
+    def answer(self, request):
+        with self.lock:
+            return self.answer_locked(request)
+
+    def answer_locked(self, request):
+        if not isinstance(request, dict):
+            return {'status': 'error', 'error': {'type': 'ValueError', 'message': "Requests must be JSON objects"}}
+        root = request.get('root', '')
+        eprefix = request.get('eprefix', '')
+        if root not in self.roots or eprefix != self.eprefix:
+            return {'status': 'refused'}
+
+        env = self.get_environment(root, eprefix)
+        manager = env['manager']
+
+        # The active vm depends on the environment of the client.
+        saved = dict((var, os.environ.get(var)) for var in CLIENT_ENV)
+        try:
+            for var in CLIENT_ENV:
+                value = request.get('env', {}).get(var)
+                if value is None:
+                    os.environ.pop(var, None)
+                else:
+                    os.environ[var] = value
+            manager.set_active_vm(None)
+
+            result = env['handler'].query(request['op'], **request.get('args', {}))
+            return {'status': 'ok', 'result': result}
+        except Exception as e:
+            return {'status': 'error', 'error': encode_error(e)}
+        finally:
+            manager.set_active_vm(None)
+            for var, value in saved.items():
+                if value is None:
+                    os.environ.pop(var, None)
+                else:
+                    os.environ[var] = value
+
+# vim:set expandtab tabstop=4 shiftwidth=4 softtabstop=4 nowrap:
@@ -0,0 +1,149 @@
+# -*- coding: UTF-8 -*-
+# Copyright 2004-2013 Gentoo Foundation
+# Distributed under the terms of the GNU General Public License v2
+
+"""
+Timing of the phases of a java-config run and counters of the work
+done in them, enabled by setting JAVA_CONFIG_TRACE. A value containing
+a / is the name of a file the summary is appended to on exit, e.g.
+JAVA_CONFIG_TRACE=./trace. 0, false, no and off leave tracing
+disabled, any other value, e.g. 1, prints the summary to stderr.
+"""
+
+import atexit
+import os
+import sys
+import time
+
+# _thread rather than threading, which takes longer to import
+# than a short java-config run.
+from _thread import allocate_lock
+
+started = time.time()
+phases = {}
+counters = {}
+output = None
+lock = allocate_lock()
+
+
+class _Phase(object):
+    """
+    Adds the wall time spent in a with block to a phase.
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.time()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.time() - self.start
+        with lock:
+            calls, seconds = phases.get(self.name, (0, 0.0))
+            phases[self.name] = (calls + 1, seconds + elapsed)
+        return False
+
+
+class _NoPhase(object):
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_no_phase = _NoPhase()
+
+
+def enable(destination='1'):
+    """
+    Start recording, and report to destination on exit,
+    a file name or '1' for stderr.
+    """
+    global enabled, output
+    if output is None:
+        atexit.register(report)
+    enabled = True
+    output = destination
+
+def phase(name):
+    """
+    Returns a context manager timing the phase name.
+    """
+    if enabled:
+        return _Phase(name)
+    return _no_phase
+
+def mark(name):
+    """
+    Records the time since java-config started as the phase name,
+    e.g. the time spent importing before the main program runs.
+    """
+    if enabled:
+        with lock:
+            phases[name] = (1, time.time() - started)
+
+def traced(name):
+    """
+    Decorator timing every call of a function as the phase name.
+    """
+    def decorate(function):
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return function(*args, **kwargs)
+            with _Phase(name):
+                return function(*args, **kwargs)
+        wrapper.__name__ = function.__name__
+        wrapper.__doc__ = function.__doc__
+        return wrapper
+    return decorate
+
+def count(name, n=1):
+    if enabled:
+        with lock:
+            counters[name] = counters.get(name, 0) + n
+
+def summary():
+    lines = ["java-config trace of %s: %.3f ms" % (' '.join(sys.argv), (time.time() - started) * 1000)]
+    if phases:
+        lines.append("  %-28s %8s %12s" % ('phase', 'calls', 'ms'))
+        for name in sorted(phases, key=lambda name: -phases[name][1]):
+            calls, seconds = phases[name]
+            lines.append("  %-28s %8d %12.3f" % (name, calls, seconds * 1000))
+    if counters:
+        lines.append("  %-28s %8s" % ('counter', 'count'))
+        for name in sorted(counters):
+            lines.append("  %-28s %8d" % (name, counters[name]))
+    return '\n'.join(lines) + '\n'
+
+def report():
+    if not enabled:
+        return
+    try:
+        if output == '1':
+            sys.stderr.write(summary())
+        else:
+            with open(output, 'a') as stream:
+                stream.write(summary())
+    except (IOError, OSError):
+        pass
+
+def destination(value):
+    """
+    Where the JAVA_CONFIG_TRACE value value asks for the summary
+    to go, see enable, or None if tracing is not wanted.
+    """
+    if not value or value.lower() in ('0', 'false', 'no', 'off'):
+        return None
+    if '/' in value:
+        return value
+    return '1'
+
+enabled = False
+_wanted = destination(os.environ.get('JAVA_CONFIG_TRACE'))
+if _wanted:
+    enable(_wanted)
+
+# vim:set expandtab tabstop=4 shiftwidth=4 softtabstop=4 nowrap:
@@ -2,8 +2,9 @@
 # Copyright 2004-2013 Gentoo Foundation
 # Distributed under the terms of the GNU General Public License v2
 
-from .FileParser import *
-from .Errors import *
+from .FileParser import EnvFileParser
+from .Errors import EnvironmentUndefinedError, InvalidVMError, PermissionError
+from .VersionKey import version_key
 import os
 
 
@@ -11,29 +12,34 @@ import os
 NEEDED_VARS = [ "JAVA_HOME", "PROVIDES_TYPE", "PROVIDES_VERSION" ]
 
 
-class VM:
-    def __init__(self, file):
+class VM(object):
+    __slots__ = ('file', 'config')
+
+    def __init__(self, file, cache = None):
         self.file = file
-        self.config = EnvFileParser(file).get_config()
+        if cache:
+            self.config = cache.get_config(file)
+        else:
+            self.config = EnvFileParser(file).get_config()
         self.check_for_needed_vars()
 
     def __eq__(self, other):
-        return self.version() == other.version()
+        return self.version_key() == other.version_key()
 
     def __ne__(self, other):
-        return self.version() != other.version()
+        return self.version_key() != other.version_key()
 
     def __lt__(self, other):
-        return self.version() < other.version()
+        return self.version_key() < other.version_key()
 
     def __gt__(self, other):
-        return self.version() > other.version()
+        return self.version_key() > other.version_key()
 
     def __le__(self, other):
-        return self.version() <= other.version()
+        return self.version_key() <= other.version_key()
 
     def __ge__(self, other):
-        return self.version() >= other.version()
+        return self.version_key() >= other.version_key()
 
     def __str__(self):
         return self.name()
@@ -83,6 +89,9 @@ class VM:
     def version(self):
         return self.query('PROVIDES_VERSION')
 
+    def version_key(self):
+        return version_key(self.version())
+
     def find_exec(self, executable):
         path = self.query('PATH')
         paths = path.split(':')
@@ -0,0 +1,84 @@
+# -*- coding: UTF-8 -*-
+# Copyright 2004-2013 Gentoo Foundation
+# Distributed under the terms of the GNU General Public License v2
+
+from bisect import bisect_left
+
+
+class VMRegistry(object):
+    """
+    Indexes the vms of an EnvironmentManager, which are numbered
+    from 1 in the order of their env file names, so that they can be
+    looked up by number, name, unversioned name, env file, JAVA_HOME
+    or the beginning of their name.
+    """
+
+    def __init__(self, vms):
+        self.by_number = dict(vms)
+        self.by_filename = {}
+        self.by_name = {}
+        self.by_java_home = {}
+        self.by_handle = {}
+        self.numbers = {}
+
+        for number in sorted(self.by_number):
+            vm = self.by_number[number]
+            name = vm.name()
+            self.numbers[name] = number
+            self.by_filename.setdefault(vm.filename(), vm)
+            self.by_name.setdefault(name, vm)
+            self.by_java_home.setdefault(vm.query('JAVA_HOME'), vm)
+            # The unversioned part of the name - bug #288695
+            suffix = '-' + vm.version()
+            if name.endswith(suffix):
+                self.by_handle.setdefault(name[:-len(suffix)], []).append(vm)
+
+        self.names = sorted(self.by_name)
+
+    def get(self, machine):
+        """
+        Returns the vm given by number, env file, name or JAVA_HOME,
+        or else the highest version among the vms whose name starts
+        with machine. Returns None if there is no such vm.
+        """
+        if str(machine).isdigit():
+            return self.by_number.get(int(machine))
+
+        for index in (self.by_filename, self.by_name, self.by_java_home):
+            vm = index.get(machine)
+            if vm:
+                return vm
+
+        matches = self.prefixed(machine)
+        if matches:
+            return max(matches, key=lambda vm: (vm.version_key(), vm.name()))
+        return None
+
+    def prefixed(self, prefix):
+        """
+        Returns the vms whose name starts with prefix, sorted by name.
+        """
+        found = []
+        for x in range(bisect_left(self.names, prefix), len(self.names)):
+            name = self.names[x]
+            if not name.startswith(prefix):
+                break
+            found.append(self.by_name[name])
+        return found
+
+    def find(self, name):
+        """
+        Returns the vms with the given name or unversioned name, or all
+        vms if name is empty, in the order of their numbers.
+        """
+        if not name:
+            return [self.by_number[number] for number in sorted(self.by_number)]
+        found = list(self.by_handle.get(name, []))
+        # VMs compare by version, look for the vm itself
+        vm = self.by_name.get(name)
+        if vm and not [other for other in found if other is vm]:
+            found.append(vm)
+            found.sort(key=lambda vm: self.numbers[vm.name()])
+        return found
+
+# vim:set expandtab tabstop=4 shiftwidth=4 softtabstop=4 nowrap:
@@ -0,0 +1,98 @@
+# -*- coding: UTF-8 -*-
+# Copyright 2004-2013 Gentoo Foundation
+# Distributed under the terms of the GNU General Public License v2
+
+
+class VersionKey(object):
+    """
+    A parsed PROVIDES_VERSION or dependency version like 1.8, 1.5* or 1.05.
+
+    Components after the first one with a leading zero are fractions,
+    1.05 is 1 and .05. A trailing * ends the comparison after that
+    component, so 1.5* matches 1.5 and 1.5.2. Keys sort by their
+    components with trailing zeros ignored, 1.10 after 1.8.
+    Use version_key to get one, keys are cached per version string.
+    """
+
+    __slots__ = ('version', 'components', 'wildcard', 'sort_key')
+
+    def __init__(self, version):
+        self.version = version
+        self.wildcard = None
+        components = []
+        for x, component in enumerate(version.split('.')):
+            if x > 0:
+                if component.endswith('*'):
+                    component = component[:-1]
+                    if self.wildcard is None:
+                        self.wildcard = x
+                    if not component:
+                        # 1.* only compares the components before the *
+                        self.wildcard = x - 1
+                        break
+                if component.startswith('0'):
+                    component = '.' + component
+            components.append(float(component))
+        self.components = tuple(components)
+
+        while components and components[-1] == 0:
+            components.pop()
+        self.sort_key = tuple(components)
+
+    def compare(self, other):
+        """
+        Returns -1, 0 or 1 like the old cmp(), honouring wildcards.
+        """
+        a, b = self.components, other.components
+        length = max(len(a), len(b))
+        if self.wildcard is not None or other.wildcard is not None:
+            length = min(w + 1 for w in (self.wildcard, other.wildcard) if w is not None)
+        for x in range(length):
+            va = a[x] if x < len(a) else 0.0
+            vb = b[x] if x < len(b) else 0.0
+            if va != vb:
+                return -1 if va < vb else 1
+        return 0
+
+    def __eq__(self, other):
+        return self.sort_key == other.sort_key
+
+    def __ne__(self, other):
+        return self.sort_key != other.sort_key
+
+    def __lt__(self, other):
+        return self.sort_key < other.sort_key
+
+    def __gt__(self, other):
+        return self.sort_key > other.sort_key
+
+    def __le__(self, other):
+        return self.sort_key <= other.sort_key
+
+    def __ge__(self, other):
+        return self.sort_key >= other.sort_key
+
+    def __hash__(self):
+        return hash(self.sort_key)
+
+    def __repr__(self):
+        return 'VersionKey(%r)' % self.version
+
+
+_keys = {}
+
+def version_key(version):
+    """
+    Returns the VersionKey of version, parsing it only the first time.
+    """
+    key = _keys.get(version)
+    if key is None:
+        key = _keys[version] = VersionKey(version)
+    return key
+
+def version_cmp(version1, version2):
+    if version1 == version2:
+        return 0
+    return version_key(version1).compare(version_key(version2))
+
+# vim:set expandtab tabstop=4 shiftwidth=4 softtabstop=4 nowrap:
@@ -4,41 +4,15 @@
 # Copyright 2005-2013 Gentoo Foundation
 # Distributed under the terms of the GNU General Public license v2
 
-from . import VM, Errors
-from java_config_2.FileParser import *
-import os, glob, re
+from java_config_2.FileParser import PrefsFileParser
+from java_config_2.VersionKey import version_key, version_cmp
+from java_config_2.DependString import _DepSpec, parse_depend_string
+from java_config_2.Errors import NoSuitableVMError
+from java_config_2 import Trace
+import os
 import os.path
 
 
-class _DepSpec(dict):
-    def __eq__(self, other):
-        assert type(self) == type(other)
-        return self == other
-
-    def __ne__(self, other):
-        assert type(self) == type(other)
-        return self != other
-
-    def __lt__(self, other):
-        assert type(self) == type(other)
-
-        if self['version'] != other['version']:
-            return self['version'] < other['version']
-        else:
-            if self['type'] != other['type']:
-                return self['type'] < other['type']
-            else:
-                return self['equality'] != other['equality']
-
-    def __gt__(self, other):
-        return not self.__lt__(other) and not self.__eq__(other)
-
-    def __le__(self, other):
-        return self.__lt__(other) or self.__eq__(other)
-
-    def __ge__(self, other):
-        return self.__gt__(other) or self.__eq__(other)
-
 # Does not handle deps correctly
 # Does however do the right thing for the only types of deps we should see
 # Ignore blockers: portage doesn't support them in a way that is usefull for us
@@ -46,10 +20,6 @@ class VersionManager:
     """
     Used to parse dependency strings, and find the best/prefered vm to use.
     """
-    atom_parser = re.compile(r"([<>=]*)virtual/(jre|jdk)[-:]([0-9\.*]+)")
-    virtuals_parser = re.compile(r"([<>=~]+)?java-virtuals/([\w\-\.:]+)")
-    package_parser = re.compile(r"([\w\-]+)/([\w\-]+)(?:\:(\d+))?")
-
     def __init__(self, env_manager):
         self.env_manager = env_manager
         self.default_pref_file = env_manager.eprefix + '/usr/share/java-config-2/config/jdk-defaults.conf'
@@ -69,87 +39,32 @@ class VersionManager:
                 self._prefs += PrefsFileParser(self.default_pref_file).get_config()
             return self._prefs
 
+    def parse_depend_string(self, atoms):
+        """
+        Returns the DependString of atoms for the current USE,
+        which is only parsed the first time it is seen.
+        """
+        return parse_depend_string(atoms, os.environ.get("USE"))
+
     def parse_depend(self, atoms):
         """Filter the dependency string for useful information"""
 
         #pkg_name, highest_pkg_target = self.get_target_from_pkg_deps(self.parse_depend_packages(atoms))
-        matched_atoms = []
-        atoms = self.filter_depend(atoms)
-        matches = self.atom_parser.findall(atoms)
-
-        if len(matches) >  0:
-            for match in matches:
-                matched_atoms.append(_DepSpec(equality=match[0], type=match[1], version=match[2]))
-
-        matched_atoms.sort()
-        matched_atoms.reverse()
-
-        return matched_atoms
+        # The parsed string is shared, callers get copies of its atoms
+        return [_DepSpec(atom) for atom in self.parse_depend_string(atoms).vm_atoms]
 
     def parse_depend_packages(self, atoms):
         """ Parse atoms for possible packages. This excludes virtual/[jdk|jre] but includes java-virtuals"""
-
-        matched_atoms = []
-        atoms = self.filter_depend(atoms)
-        matches = self.package_parser.findall(atoms)
-
-        if len(matches) > 0:
-            for match in matches:
-                if not (match[0] == 'virtual' and (match[1] == 'jdk-1' or match[1] == 'jre-1' or match[1] == 'jdk' or match[1] == 'jre' )):
-                        matched_atoms.append({'equality':'=', 'cat':match[0], 'pkg':match[1], 'slot':match[2]})
-
-        return matched_atoms
+        return [dict(package) for package in self.parse_depend_string(atoms).packages]
 
     def filter_depend( self, atoms ):
         """Filter the dependency string for useful information"""
-
-        def dep_string_reduce(dep_string,enabled_useflags):
-            dest = []
-            tokens = iter(dep_string.split())
-            useflags = enabled_useflags.split()
-
-            for token in tokens:
-                if token[-1] == "?":
-                    if token.startswith("!"):
-                        skip = token[1:-1] in useflags
-                    else:
-                        skip = token[:-1] not in useflags
-                    if skip:
-                        level = 0
-                        while 1:
-                            token = next(tokens)
-                            if token == "(":
-                                level+=1
-                            if token == ")":
-                                level-=1
-                                if level < 1:
-                                    break
-                    continue
-                elif token == "(" or token == ")":
-                    continue
-                else:
-                    dest.append(token)
-
-            return " ".join(dest)
-
         # gjl does not use use flags
-        try:
-            use = os.environ["USE"]
-            atoms = dep_string_reduce(atoms, use)
-        except KeyError:
-            pass
-        return atoms
+        return self.parse_depend_string(atoms).text
 
     def parse_depend_virtuals(self, atoms):
         """Filter the dependency string for useful information"""
-        atoms=self.filter_depend(atoms)
-        virtuals_matches = self.virtuals_parser.findall(atoms)
-        matched_virtuals = ""
-
-        for match in virtuals_matches:
-            matched_virtuals += " " + match[1].replace(':0', '').replace(':', '-')
-
-        return matched_virtuals[1:]
+        return self.parse_depend_string(atoms).virtuals
 
     def matches(self, version_a, version_b, operator):
         val = self.version_cmp(version_a, version_b)
@@ -163,9 +78,10 @@ class VersionManager:
         else:                  return val == 0
 
     def version_satisfies(self, atoms, vm):
-        version = vm.version()
-        matched_atoms = self.parse_depend(atoms)
+        return self.atoms_satisfied(self.parse_depend(atoms), vm)
 
+    def atoms_satisfied(self, matched_atoms, vm):
+        version = vm.version()
         for atom in matched_atoms:
             if vm.is_type(atom['type']):
                 if self.matches(version, atom['version'], atom['equality']):
@@ -173,18 +89,10 @@ class VersionManager:
         return False
 
     def get_lowest_atom(self, atoms):
-        lowest = None
-        for atom in atoms:
-            if not lowest:
-                lowest = atom
-            else:
-                if self.version_cmp(lowest['version'], atom['version']) > 0:
-                    lowest = atom
-
-        if lowest:
-            return atom
+        if atoms:
+            return min(atoms, key=lambda atom: version_key(atom['version']))
         else:
-            raise Exception("Couldn't find a VM dep")
+            raise NoSuitableVMError("Couldn't find a VM dep")
 
     def get_lowest(self, atoms):
         atoms = self.parse_depend(atoms)
@@ -194,7 +102,7 @@ class VersionManager:
         if lowest:
             return '.'.join(lowest.strip('*').split('.')[0:2])
         else:
-            raise Exception("Couldn't find a VM dep")
+            raise NoSuitableVMError("Couldn't find a VM dep")
 
     def get_target_from_pkg_deps(self, matches):
         """ Get the lowest virtual machine version from a packages dependencies."""
@@ -229,7 +137,76 @@ class VersionManager:
 
         return pkg_name, highest
 
+    @Trace.traced('get_vm')
     def get_vm(self, atoms, allow_build_only = False):
+        """
+        Returns the best vm for the dependency string atoms.
+        Results are remembered in the manager's resolution cache.
+        """
+        cache = self.env_manager.resolution_cache
+        if cache is None:
+            return self.resolve_vm(atoms, allow_build_only)
+
+        # USE conditionals are already reduced by filter_depend
+        parsed = self.parse_depend_string(atoms)
+        key = (' '.join(parsed.text.split()), bool(allow_build_only))
+        fingerprint = self.fingerprint()
+        stamps = self.virtual_stamps(parsed.virtuals)
+        result = cache.get(key, fingerprint, stamps)
+        if result is not None:
+            if result[0] == 'error':
+                raise NoSuitableVMError(result[1])
+            vm = self.env_manager.get_vm(result[1])
+            if vm:
+                return vm
+
+        try:
+            vm = self.resolve_vm(atoms, allow_build_only)
+        except Exception as ex:
+            # Only remember that no vm fits, not unrelated failures
+            if isinstance(ex, NoSuitableVMError):
+                cache.put(key, fingerprint, stamps, ('error', str(ex)))
+            raise
+        cache.put(key, fingerprint, stamps, ('vm', vm.name()))
+        return vm
+
+    def fingerprint(self):
+        """
+        Describes what get_vm looks at for every dependency string,
+        the vms and the preferences, through the modification times
+        of the files involved.
+        """
+        manager = self.env_manager
+        files = [manager.vms_path, self.default_pref_file,
+                 manager.system_config_path + 'virtuals']
+        if os.path.isdir(manager.vms_path):
+            files += [os.path.join(manager.vms_path, f) for f in sorted(os.listdir(manager.vms_path))]
+        return (self.stat_files(files), manager.system_vm_name())
+
+    def virtual_stamps(self, need_virtual):
+        """
+        Describes the java-virtuals need_virtual needs. Their providers
+        are packages, whose directories appear and disappear in /usr/share.
+        """
+        if not need_virtual:
+            return ()
+        manager = self.env_manager
+        files = [manager.eroot + '/usr/share', manager.virtual_path]
+        files += [manager.virtual_path + v for v in need_virtual.split()]
+        return self.stat_files(files)
+
+    def stat_files(self, files):
+        stamps = []
+        Trace.count('stat calls', len(files))
+        for file in files:
+            try:
+                st = os.stat(file)
+                stamps.append((file, st.st_mtime, st.st_size, st.st_ino))
+            except OSError:
+                stamps.append((file, None))
+        return tuple(stamps)
+
+    def resolve_vm(self, atoms, allow_build_only = False):
         pkg_name, highest_pkg_target = self.get_target_from_pkg_deps(self.parse_depend_packages(atoms))
 
         matched_atoms = self.parse_depend(atoms)
@@ -239,6 +216,14 @@ class VersionManager:
         if not len(matched_virtuals) == 0:
             need_virtual = matched_virtuals
 
+        # The vms providing all needed virtuals, worked out on first use
+        providers = []
+        def have_provider(gvm):
+            matrix = self.env_manager.get_provider_matrix()
+            if not providers:
+                providers.append(matrix.satisfying(need_virtual))
+            return matrix.provides(providers[0], gvm)
+
         prefs = self.get_prefs()
         # first try to find vm based on preferences
         low = self.get_lowest(atoms) # Lowest vm version we can use
@@ -250,7 +235,7 @@ class VersionManager:
                         for gvm in self.find_vm(vmProviderString, atom, highest_pkg_target, allow_build_only):
                             if need_virtual: # Package we are finding a vm for needs a virtual
                                 # New, correct way of searching for virtuals
-                                if self.env_manager.have_provider(need_virtual, gvm, self): # We have a package available that provides it, will use that
+                                if have_provider(gvm): # We have a package available that provides it, will use that
                                     return gvm
                             else:
                                 return gvm          # use it!
@@ -260,7 +245,7 @@ class VersionManager:
         for atom in matched_atoms:
             for gvm in self.find_vm("", atom, highest_pkg_target, allow_build_only):
                 if need_virtual:         # Package we are finding a vm for needs a virtual
-                    if self.env_manager.have_provider(need_virtual, gvm, self):
+                    if have_provider(gvm):
                         return gvm
                 else:
                     return gvm
@@ -277,7 +262,7 @@ class VersionManager:
         if need_virtual:
             error += "this package requiring virtual(s) " + need_virtual
 
-        raise Exception(error)
+        raise NoSuitableVMError(error)
 
 
     def find_vm(self, vmProviderString, atom, min_package_target, allow_build_only = True):
@@ -294,58 +279,16 @@ class VersionManager:
                     yield vm
 
     def version_cmp(self, version1, version2):
-        #Parly stolen from portage.py
-        if version1 == version2:
-            return 0
-
-        version1 = version1.split('.')
-        version2 = version2.split('.')
-
-        check_len = None
-        for x in range(1, len(version1)):
-            if version1[x][-1] == '*':
-                version1[x] = version1[x][:-1]
-                check_len = x
-            if version1[x][0] == '0':
-                version1[x]='.' + version1[x]
-
-        for x in range(1, len(version2)):
-            if version2[x][-1] == '*':
-                version2[x] = version2[x][:-1]
-                if (not check_len) or (check_len and check_len > x):
-                    check_len = x
-            if version2[x][0] == '0':
-                version2[x]='.' + version2[x]
-
-        if len(version2) < len(version1):
-            version2.extend(["0"]*(len(version1)-len(version2)))
-        elif len(version1) < len(version2):
-            version1.extend(["0"]*(len(version2)-len(version1)))
-
-        for x in range(0, len(version1)):
-            if check_len and x > check_len:
-                return 0
-            ret = float(version1[x]) - float(version2[x])
-            if ret != 0:
-                return ret
-        return 0
-
+        return version_cmp(version1, version2)
 
     def get_needed_packages(self, *packages):
-        unresolved = set()
-        for package in packages:
-            unresolved.add(package)
-
-        resolved = set()
-
-        while len(unresolved) > 0:
-            pkg = unresolved.pop()
-            resolved.add(pkg)
+        graph = self.env_manager.get_dependency_graph()
+        needed = graph.walk(packages)
+        for pkg in needed:
             # dep is in the form of (jar, pkg)
-            for dep in self.env_manager.get_pkg_deps(pkg):
-                dep_pkg = dep[-1]
-                p = self.env_manager.get_package(dep_pkg)
+            for dep, p in graph.edges(pkg):
                 if p is None:
+                    dep_pkg = dep[-1]
                     if ',' in dep_pkg:
                         msg = """
 Package %s has a broken DEPEND entry in package.env. Please reinstall it.
@@ -359,9 +302,6 @@ dependency of %s. Please run emerge -1Da %s and if it does not bring in the
 needed dependency, report this to http://bugs.gentoo.org.
 """
                         msg = msg % (dep_pkg,pkg,pkg)
-                    abort(msg)
-
-                if p not in resolved:
-                    unresolved.add(p)
+                    raise Exception(msg)
 
-        return resolved
+        return set(needed)
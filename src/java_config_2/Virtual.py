@@ -5,84 +5,132 @@
 # $Header: $
 
 
-from java_config_2.FileParser import *
 from java_config_2.Errors import EnvironmentUndefinedError, ProviderUnavailableError
-from java_config_2.Package import *
-from java_config_2.VersionManager import VersionManager
-import re, sys
+from java_config_2.Package import Package
+from java_config_2.PathBuilder import PathBuilder
+from java_config_2 import Trace
 
 
 class Virtual(Package):
     """
     Class representing an installed java virtual.
     """
+    __slots__ = ('_manager', 'providers', 'vm_providers', 'resolved',
+                 'active_package', 'avaliable_vms', '_min_target', 'loaded')
+
     def __init__(self, name, manager, file = None):
-        self._file = file
-        self._name = name
+        Package.__init__(self, name, file, manager.config_cache)
         self._manager = manager
 
         # Arrays of packages/vms as strings, used to delay
         # using of real objects until EnvironmentManager
         # has loaded them all.
-        self._packages = []
-        self._vms = []
         self.providers = []
         self.vm_providers = []
 
+        # Worked out from the providers on first use
+        self.resolved = None
+
         self.active_package = None
         self.avaliable_vms = []
 
-        self.min_target = None
+        self._min_target = None
         self.loaded = False
 
-        if self._file:
-            self._config = EnvFileParser(file).get_config()
+        if "PROVIDERS" in self._config:
+            self.providers = self._config["PROVIDERS"].split(' ')
 
-            if "PROVIDERS" in self._config:
-                self.providers = self._config["PROVIDERS"].split(' ')
+        if "VM" in self._config:
+            self.vm_providers = self._config["VM"].split(' ')
 
-            if "VM" in self._config:
-                self.vm_providers = self._config["VM"].split(' ')
-        else:
-            self._config = {}
-
-        # Refactored to make __init__ smaller.
-        self.load_providers(self.providers, self.vm_providers)
+    def resolve(self):
+        """
+        Works out the provider packages and vms of this virtual,
+        which are shared by all virtuals of the same name in the manager.
+        """
+        if self.resolved is None:
+            resolved = self._manager.virtual_providers.get(self._name)
+            if resolved is None:
+                with self._manager.key_lock(('virtual', self._name)):
+                    resolved = self._manager.virtual_providers.get(self._name)
+                    if resolved is None:
+                        Trace.count('virtuals resolved')
+                        resolved = self.load_providers(self.providers, self.vm_providers)
+                        # Loading the vms on the way starts a new dictionary
+                        self._manager.virtual_providers[self._name] = resolved
+            self.resolved = resolved
+            if self._min_target is None:
+                self._min_target = self.resolved[2]
+        return self.resolved
+
+    @property
+    def _packages(self):
+        return self.resolve()[0]
+
+    @property
+    def _vms(self):
+        return self.resolve()[1]
+
+    @property
+    def min_target(self):
+        self.resolve()
+        return self._min_target
+
+    @min_target.setter
+    def min_target(self, target):
+        self.resolve()
+        self._min_target = target
 
     def load_providers(self, temp_packages, vms):
+        """
+        Returns the provider packages and vms and the lowest
+        version of these vms.
+        """
+        packages = []
+        available_vms = []
+        min_target = None
+
         # Now load system pref.  Really should support
         # List of packages instead of single package.
         all_prefs = self._manager.get_virtuals_pref().get_config()
         if self.name() in all_prefs:
             if all_prefs[self.name()] in temp_packages:
-                self._packages.append(all_prefs[self.name()])
+                packages.append(all_prefs[self.name()])
         else:
             if 'PREFER_UPSTREAM' in all_prefs:
+                import re
                 for package in temp_packages:
                     if re.compile(all_prefs['PREFER_UPSTREAM'] + '*').match(package):
-                        self._packages.append(package)
+                        packages.append(package)
                         break
 
         for element in temp_packages:
-            if not element in self._packages:
-                self._packages.append(element)
-
-        verman = VersionManager(self._manager)
-        vmachines = self._manager.get_virtual_machines()
-        for vm in vmachines:
-            if verman.version_satisfies(" ".join(vms), vmachines[vm]):
-                self._vms.append(vmachines[vm].name())
-
-        for vm in vms:
-            if self._manager.get_vm(vm):
-                self._vms.append(vm)
-                if not self.min_target:
-                    self.min_target = self._manager.get_vm(vm).version()
-                if verman.version_cmp(self.min_target, self._manager.get_vm(vm).version()) > 0:
-                    self.min_target = self._manager.get_vm(vm).version()
-
-        if not self._packages and not self._vms:
+            if not element in packages:
+                packages.append(element)
+
+        # Virtuals only provided by packages don't need the vms
+        if vms:
+            from java_config_2.VersionManager import VersionManager
+            verman = VersionManager(self._manager)
+            vmachines = self._manager.get_virtual_machines()
+            matched_atoms = verman.parse_depend(" ".join(vms))
+            for vm in vmachines:
+                if verman.atoms_satisfied(matched_atoms, vmachines[vm]):
+                    available_vms.append(vmachines[vm].name())
+
+            lowest = None
+            for vm in vms:
+                gvm = self._manager.get_vm(vm)
+                if gvm:
+                    available_vms.append(vm)
+                    if lowest is None or gvm.version_key() < lowest.version_key():
+                        lowest = gvm
+            if lowest:
+                min_target = lowest.version()
+
+        if not packages and not available_vms:
             raise ProviderUnavailableError( self._name, ' '.join(self.vm_providers), ' '.join(self.providers) )
+        return packages, available_vms, min_target
 
     def file(self):
         # Investigate if anything uses this
@@ -155,14 +203,14 @@ class Virtual(Package):
             return ""
 
     def query_all_providers(self, var):
-        paths = []
+        paths = PathBuilder()
         for pkg in self._packages:
             try:
                 opkg = self._manager.get_package(pkg)
-                paths.append(opkg.query(var))
+                paths.extend(opkg.query(var))
             except:
                 continue
-        return ":".join(paths).replace('::', ':').strip(':')
+        return str(paths)
 
 
     def query(self, var):
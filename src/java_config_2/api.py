@@ -0,0 +1,288 @@
+# -*- coding: UTF-8 -*-
+# Copyright 2004-2013 Gentoo Foundation
+# Distributed under the terms of the GNU General Public License v2
+
+"""
+The interface of java-config for Python programs, e.g. build tools
+which would otherwise run java-config-2 or gjl and parse their output.
+
+    from java_config_2 import api
+
+    session = api.Session()
+    classpath = session.classpath(['ant-core', 'junit'], with_deps=True)
+    vm = session.get_vm('>=virtual/jdk-1.8')
+    java = session.find_exec('java', vm)
+
+A Session keeps the environment it has read, so thousands of queries
+through one session only read every env file once. Call reload() to
+see packages and vms installed since. The module level functions use
+a session shared by the whole program, see get_session(). Sessions
+only write the persistent caches when created with use_cache=True.
+
+Results are plain lists, dicts, strings and the VM and Package objects
+of java_config_2. Failures raise the exceptions of java_config_2.Errors,
+which are also available from this module.
+"""
+
+from .Errors import (EnvironmentUndefinedError, InvalidConfigError, InvalidVMError,
+                     MissingDependencyError, NoSuitableVMError, PermissionError,
+                     ProviderUnavailableError, ServerUnavailableError, UnexistingPackageError)
+
+import os
+
+
+class Session(object):
+    """
+    One warm EnvironmentManager for ROOT and EPREFIX, by default those
+    of the environment. With use_server, query() asks a running
+    java-config server first, as the command line tools do. With
+    threadsafe, the session can be shared by threads, which pass the
+    vm to use to the methods instead of calling select_vm.
+
+    With use_cache, parsed env files and vm resolutions are read from
+    and, when the program exits, written to the persistent caches in
+    $ROOT/var/cache/java-config-2, as the command line tools do.
+    Without it, the default, a session writes nothing.
+    """
+
+    def __init__(self, root=None, eprefix=None, use_cache=False, use_server=False, threadsafe=False):
+        if root is None:
+            root = os.getenv('ROOT', '')
+        if eprefix is None:
+            eprefix = os.getenv('EPREFIX', '@GENTOO_PORTAGE_EPREFIX@')
+        self.root = root
+        self.eprefix = eprefix
+        self.use_cache = use_cache
+        self.threadsafe = threadsafe
+        self.client = None
+        if use_server:
+            from .Client import Client
+            self.client = Client(root, eprefix)
+        self.reload()
+
+    def reload(self):
+        """
+        Forget everything read so far.
+        """
+        self._manager = None
+        self._handler = None
+        if self.threadsafe:
+            # Threads must not create managers of their own
+            self.handler
+
+    # The manager and handler are only imported once they are needed,
+    # queries answered by the server need neither of them.
+
+    @property
+    def manager(self):
+        """
+        The EnvironmentManager of the session.
+        """
+        if self._manager is None:
+            from .EnvironmentManager import EnvironmentManager
+            self._manager = EnvironmentManager(self.root, self.eprefix, use_cache=self.use_cache,
+                                               threadsafe=self.threadsafe)
+        return self._manager
+
+    @property
+    def handler(self):
+        """
+        The QueryHandler of the session.
+        """
+        if self._handler is None:
+            from .QueryHandler import QueryHandler
+            self._handler = QueryHandler(self.manager)
+        return self._handler
+
+    def query(self, op, **args):
+        """
+        Answers one of the queries of QueryHandler, through the
+        java-config server if the session uses it and it is running.
+        """
+        if self.client is not None:
+            active = self._manager and self._manager.active_vm
+            if active and 'vm' not in args:
+                args['vm'] = active.filename()
+            try:
+                return self.client.query(op, **args)
+            except ServerUnavailableError:
+                pass
+        return self.handler.query(op, **args)
+
+    # Virtual machines
+
+    def active_vm(self):
+        """
+        The vm selected with select_vm, GENTOO_VM or the user or
+        system vm. Raises InvalidVMError if there is none.
+        """
+        return self.manager.get_active_vm()
+
+    def select_vm(self, vm):
+        """
+        Use vm, a VM or anything vm() accepts, as the active vm of this session.
+        """
+        if not hasattr(vm, 'filename'):
+            vm = self.vm(vm)
+        self.manager.set_active_vm(vm)
+        return vm
+
+    def vm(self, name):
+        """
+        The vm given by number, name, env file, JAVA_HOME or the beginning
+        of its name. Raises InvalidVMError if there is no such vm.
+        """
+        vm = self.manager.get_vm(name)
+        if not vm:
+            raise InvalidVMError("No vm matching %s" % name)
+        return vm
+
+    def vms(self):
+        """
+        All valid vms, in the order java-config-2 -L numbers them.
+        """
+        vms = self.manager.get_virtual_machines()
+        return [vms[number] for number in sorted(vms)]
+
+    def vm_query(self, var, vm=None):
+        """
+        The value of var in the env file of vm or the active vm.
+        Raises EnvironmentUndefinedError if it is not defined.
+        """
+        return (vm or self.active_vm()).query(var)
+
+    def java_home(self, vm=None):
+        return self.vm_query('JAVA_HOME', vm)
+
+    def find_exec(self, executable, vm=None):
+        """
+        The path of executable in the PATH of vm or the active vm.
+        Raises PermissionError if it can not be run.
+        """
+        path = (vm or self.active_vm()).find_exec(executable)
+        if path is None:
+            raise PermissionError("%s was not found" % executable)
+        return path
+
+    def get_vm(self, depend, allow_build_only=False):
+        """
+        The best vm for the dependency string depend.
+        Raises NoSuitableVMError if none is good enough.
+        """
+        return self.handler.verman.get_vm(depend, allow_build_only)
+
+    def lowest(self, depend):
+        """
+        The lowest jdk/jre version depend allows, e.g. to be used as -target.
+        """
+        return self.handler.get_lowest(depend)
+
+    def is_sufficient(self, depend, vm=None):
+        return self.handler.verman.version_satisfies(depend, vm or self.active_vm())
+
+    def parse_depend(self, depend):
+        """
+        The jdk/jre atoms of depend as (equality, type, version) tuples.
+        """
+        return [tuple(atom) for atom in self.handler.parse_depend(depend)]
+
+    # Packages
+
+    def package(self, name):
+        """
+        The package or virtual name. Raises UnexistingPackageError if
+        it is not installed.
+        """
+        pkg = self.manager.get_package(name)
+        if not pkg:
+            raise UnexistingPackageError(name)
+        return pkg
+
+    def packages(self, sort=True):
+        """
+        Iterates over all packages and virtuals, see
+        EnvironmentManager.iter_packages.
+        """
+        return self.manager.iter_packages(sort)
+
+    def package_query(self, name, var):
+        """
+        The value of var in the package.env of package name, or None.
+        """
+        return self.package(name).query(var)
+
+    def path(self, packages, query, with_deps=False, missing=None, vm=None):
+        """
+        The entries of query, e.g. CLASSPATH, of the packages as a list.
+        With with_deps the dependencies of the packages are included.
+        Their missing dependencies are added to the set missing, or
+        raise MissingDependencyError if it is not given. Virtuals are
+        provided by vm, or the active vm.
+        """
+        if isinstance(packages, str):
+            packages = packages.split(',')
+        found = set()
+        if with_deps:
+            path = self.manager.build_dep_path(list(packages), query, found, vm)
+        else:
+            path = self.manager.build_path(list(packages), query, vm)
+        if missing is not None:
+            missing.update(found)
+        elif found:
+            raise MissingDependencyError(found)
+        return list(path)
+
+    def classpath(self, packages, with_deps=False, missing=None, vm=None):
+        return self.path(packages, 'CLASSPATH', with_deps, missing, vm)
+
+    def library_path(self, packages, with_deps=False, missing=None, vm=None):
+        return self.path(packages, 'LIBRARY_PATH', with_deps, missing, vm)
+
+    def env(self, packages, vm=None):
+        """
+        The environment variables the packages and their dependencies
+        ask for with ENV_VARS, as a dict.
+        """
+        if isinstance(packages, str):
+            packages = packages.split(',')
+        return self.manager.build_dep_env_vars(list(packages), set(), vm)
+
+    def launch(self, package, get_vm=False, fields=None):
+        """
+        Everything needed to start package, as returned by gjl's query:
+        vm, classpath, dep_classpath, dep_library, missing, env and files,
+        or only the fields of QueryHandler.launch given.
+        """
+        return self.handler.launch(package, get_vm, fields)
+
+
+_session = None
+
+def get_session():
+    """
+    The session shared by the module level functions.
+    """
+    global _session
+    if _session is None:
+        _session = Session()
+    return _session
+
+def active_vm():
+    return get_session().active_vm()
+
+def get_vm(depend, allow_build_only=False):
+    return get_session().get_vm(depend, allow_build_only)
+
+def classpath(packages, with_deps=False, missing=None):
+    return get_session().classpath(packages, with_deps, missing)
+
+def library_path(packages, with_deps=False, missing=None):
+    return get_session().library_path(packages, with_deps, missing)
+
+def env(packages):
+    return get_session().env(packages)
+
+def launch(package, get_vm=False, fields=None):
+    return get_session().launch(package, get_vm, fields)
+
+# vim:set expandtab tabstop=4 shiftwidth=4 softtabstop=4 nowrap:
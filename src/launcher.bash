@@ -28,34 +28,64 @@ elif [[ -f "${gjl_system_env}" ]]; then
 	source "${gjl_system_env}"
 fi
 
-# Build gjl arguments
+# Reuse the launch plan of an earlier run, unless one of the files
+# it was computed from has changed since, see gjl
 # ---------------------
-request="--package ${gjl_package} --get-args"
-
+results=
 if [[ -n ${gjl_main} ]]; then
 	gjl_starte=${gjl_main}
-elif [[ -n ${gjl_jar} ]]; then
-	request="${request} --get-jar ${gjl_jar}"
-else
-	# Check if the installed package has only one jar and use that
-	jars=$(java-config --classpath=${gjl_package})
-	if [[ "${jars/:}" = "${jars}" ]]; then
-		request="${request} --get-jar ${jars}"
-	else
-		abort "Need main or jar to start"
-	fi
 fi
 
-if [[ -z ${GENTOO_VM} ]]; then
-	request="${request} --get-vm"
-elif [[ -n ${GJL_DEBUG} ]]; then
-	echo "Detected \$GENTOO_VM is set, not trying to change vm" >&2
+if [[ -n ${HOME} && -z ${GJL_NO_PLAN} ]]; then
+	gjl_plan="${XDG_CACHE_HOME:-${HOME}/.cache}/java-config-2/launcher/${gjl_package}"
+	gjl_plan_want="main=${gjl_main}|jar=${gjl_jar}|vm=${GENTOO_VM}|cp=${CLASSPATH}|lp=${LD_LIBRARY_PATH}|jlp=${JAVA_LIBRARY_PATH}"
+	# Selecting a user vm for the first time does not touch any
+	# of the watched files
+	if [[ -L "${HOME}/.gentoo@GENTOO_PORTAGE_EPREFIX@/java-config-2/current-user-vm" ]]; then
+		gjl_plan_want="${gjl_plan_want}|user-vm"
+	fi
+	if [[ -f ${gjl_plan} ]] && source "${gjl_plan}" && [[ "${gjl_plan_key}" == "${gjl_plan_want}" ]]; then
+		results="${gjl_plan_results}"
+		for gjl_plan_file in "${gjl_plan_files[@]}"; do
+			if [[ ! -e ${gjl_plan_file} || ${gjl_plan_file} -nt ${gjl_plan} ]]; then
+				results=
+				break
+			fi
+		done
+	fi
+	[[ "${GJL_DEBUG}" && "${results}" ]] && echo "Using launch plan: ${gjl_plan}" >&2
 fi
 
-# Get the information we need
-# ----------------------------
-[[ "${GJL_DEBUG}" ]] && echo "Calling: gjl ${request}"
-results=$(gjl ${request}) || abort "Couldn't get needed information"
+if [[ -z ${results} ]]; then
+	# Build gjl arguments
+	# ---------------------
+	request="--package ${gjl_package} --get-args"
+
+	if [[ -n ${gjl_main} ]]; then
+		:
+	elif [[ -n ${gjl_jar} ]]; then
+		request="${request} --get-jar ${gjl_jar}"
+	else
+		# Check if the installed package has only one jar and use that
+		jars=$(java-config --classpath=${gjl_package})
+		if [[ "${jars/:}" = "${jars}" ]]; then
+			request="${request} --get-jar ${jars}"
+		else
+			abort "Need main or jar to start"
+		fi
+	fi
+
+	if [[ -z ${GENTOO_VM} ]]; then
+		request="${request} --get-vm"
+	elif [[ -n ${GJL_DEBUG} ]]; then
+		echo "Detected \$GENTOO_VM is set, not trying to change vm" >&2
+	fi
+
+	# Get the information we need
+	# ----------------------------
+	[[ "${GJL_DEBUG}" ]] && echo "Calling: gjl ${request}"
+	results=$(GJL_PLAN="${gjl_plan}" GJL_PLAN_KEY="${gjl_plan_want}" gjl ${request}) || abort "Couldn't get needed information"
+fi
 eval $results
 
 if [[ -n ${gjl_vm} ]]; then
@@ -0,0 +1,130 @@
+import os, shutil, tempfile, timeit
+
+from java_config_2.EnvironmentManager import EnvironmentManager
+from java_config_2.VersionManager import VersionManager
+
+VM_VERSIONS = ('1.5', '1.6', '1.7', '1.8', '9', '11')
+
+def write(path, content):
+    directory = os.path.dirname(path)
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    with open(path, 'w') as stream:
+        stream.write(content)
+
+def package_name(layer, i):
+    return 'pkg-%d-%d' % (layer, i)
+
+def generate_root(root, packages=100, fanout=3, depth=5, virtuals=10, providers=5, vms=12):
+    """
+    Write a synthetic ROOT with:
+    packages spread over depth layers, each depending on fanout
+    packages of the next layer, every other dependency on one jar only,
+    virtuals with providers packages each, every third of them also
+    provided by vms, and vms of all the VM_VERSIONS.
+    Returns the names of the packages of the first layer.
+    """
+    vm_path = os.path.join(root, 'usr/share/java-config-2/vm')
+    for i in range(vms):
+        version = VM_VERSIONS[i % len(VM_VERSIONS)]
+        name = 'jdk-%d-%s' % (i, version)
+        write(os.path.join(vm_path, name), '\n'.join([
+            'VERSION="Synthetic JDK %s"' % version,
+            'JAVA_HOME=/opt/%s' % name,
+            'PATH="${JAVA_HOME}/bin:${JAVA_HOME}/jre/bin"',
+            'PROVIDES_TYPE="JDK JRE"',
+            'PROVIDES_VERSION="%s"' % version,
+            'BUILD_ONLY="%s"' % (i % 5 == 4 and 'TRUE' or 'FALSE'),
+            'ENV_VARS="JAVA_HOME PATH"',
+            'VMHANDLE="%s"' % name, '']))
+
+    write(os.path.join(root, 'etc/java-config-2/virtuals'), '')
+    os.symlink(os.path.join(vm_path, 'jdk-0-1.5'), os.path.join(root, 'etc/java-config-2/current-system-vm'))
+
+    per_layer = max(1, packages // depth)
+    for layer in range(depth):
+        for i in range(per_layer):
+            name = package_name(layer, i)
+            jars = ['/usr/share/%s/lib/%s-%d.jar' % (name, name, j) for j in range(3)]
+            lines = ['DESCRIPTION="Synthetic package %s"' % name,
+                     'CLASSPATH="%s"' % ':'.join(jars),
+                     'LIBRARY_PATH="/usr/lib/%s"' % name,
+                     'TARGET="%s"' % VM_VERSIONS[i % 4],
+                     'ENV_VARS="%s_HOME"' % name.upper().replace('-', '_'),
+                     '%s_HOME="/usr/share/%s"' % (name.upper().replace('-', '_'), name)]
+            if layer + 1 < depth:
+                deps = []
+                for j in range(fanout):
+                    dep = package_name(layer + 1, (i * fanout + j) % per_layer)
+                    if j % 2:
+                        dep = '%s-1.jar@%s' % (dep, dep)
+                    deps.append(dep)
+                lines.append('DEPEND="%s"' % ':'.join(deps))
+                lines.append('OPTIONAL_DEPEND="not-installed-%d"' % i)
+            write(os.path.join(root, 'usr/share', name, 'package.env'), '\n'.join(lines) + '\n')
+
+    for i in range(virtuals):
+        lines = ['PROVIDERS="%s"' % ' '.join(package_name(depth - 1, (i + j) % per_layer) for j in range(providers))]
+        if i % 3 == 0:
+            lines.append('VM=">=virtual/jdk-1.%d"' % (6 + i % 3))
+        write(os.path.join(root, 'usr/share/java-config-2/virtuals/virtual-%d' % i), '\n'.join(lines) + '\n')
+
+    return [package_name(0, i) for i in range(per_layer)]
+
+def measure(function, number=3):
+    return min(timeit.repeat(function, number=number, repeat=3)) / number
+
+def run(sizes=(100, 1000, 5000)):
+    """
+    Time the main operations on synthetic environments of the given
+    numbers of packages and return the seconds per call by name.
+    """
+    results = {}
+    depends = ['>=virtual/jdk-1.6', '|| ( =virtual/jdk-1.8 =virtual/jdk-1.7 ) java-virtuals/virtual-0',
+               'java? ( >=virtual/jdk-1.5* ) dev-java/pkg-0-0:0 java-virtuals/virtual-3']
+    for size in sizes:
+        directory = tempfile.mkdtemp()
+        try:
+            roots = generate_root(directory, packages=size, virtuals=max(5, size // 50), vms=max(6, size // 100))
+            new = lambda: EnvironmentManager(directory)
+
+            def load_packages():
+                em = new()
+                em.load_packages()
+                em.parse_packages()
+
+            def load_vms():
+                new().load_vms()
+
+            em = new()
+            em.set_active_vm(em.get_vm('jdk-0-1.5'))
+            def build_dep_path():
+                em.invalidate_dependency_graphs()
+                em.build_dep_path(list(roots), 'CLASSPATH', set())
+
+            def build_dep_env_vars():
+                em.invalidate_dependency_graphs()
+                em.build_dep_env_vars(list(roots), set())
+
+            verman = VersionManager(em)
+            def get_vm():
+                for depend in depends:
+                    verman.get_vm(depend)
+
+            def parse_depend():
+                for depend in depends:
+                    verman.parse_depend(depend)
+
+            print("Environment with %d packages" % size)
+            for function in (load_packages, load_vms, build_dep_path, build_dep_env_vars, get_vm, parse_depend):
+                seconds = measure(function)
+                results['%s/%d' % (function.__name__, size)] = seconds
+                print("  %-20s %10.3f ms" % (function.__name__, seconds * 1000))
+        finally:
+            shutil.rmtree(directory)
+    return results
+
+if __name__ == '__main__':
+    run()
+
+# vim:set expandtab tabstop=4 shiftwidth=4 softtabstop=4 nowrap:
@@ -0,0 +1,51 @@
+import os, shutil, tempfile, timeit
+
+from java_config_2.FileParser import EnvFileParser, parse_env_files
+
+def write_env_file(path, variables, references):
+    """
+    Write a package.env with `variables` lines, each one a classpath
+    with `references` references to JAVA_HOME, JARDIR or undefined
+    variables.
+    """
+    names = ('JAVA_HOME', 'JARDIR', 'UNDEFINED')
+    with open(path, 'w') as stream:
+        stream.write('JAVA_HOME="/opt/jdk"\n')
+        stream.write('JARDIR="${JAVA_HOME}/lib"\n')
+        for i in range(variables):
+            jars = ['${%s}/jar-%d-%d.jar' % (names[j % 3], i, j) for j in range(references)]
+            stream.write('VAR_%d="%s"\n' % (i, ':'.join(jars)))
+    return os.path.getsize(path)
+
+def measure(function, number):
+    return min(timeit.repeat(function, number=number, repeat=3)) / number
+
+def run():
+    results = {}
+    directory = tempfile.mkdtemp()
+    try:
+        print("EnvFileParser: single files")
+        for variables, references in ((10, 2), (50, 20), (200, 100)):
+            path = os.path.join(directory, 'large-%d-%d.env' % (variables, references))
+            size = write_env_file(path, variables, references)
+            seconds = measure(lambda: EnvFileParser(path), 10)
+            results['EnvFileParser/%d-%d' % (variables, references)] = seconds
+            print("  %4d lines x %3d references: %9.3f ms %9.2f MB/s" % (variables, references, seconds * 1000, size / seconds / 1e6))
+
+        print("parse_env_files: many small files")
+        files = []
+        for i in range(1000):
+            path = os.path.join(directory, 'package-%d.env' % i)
+            write_env_file(path, 8, 4)
+            files.append(path)
+        seconds = measure(lambda: parse_env_files(files), 3)
+        results['parse_env_files/%d' % len(files)] = seconds
+        print("  %d files: %9.3f ms %9.0f files/s" % (len(files), seconds * 1000, len(files) / seconds))
+    finally:
+        shutil.rmtree(directory)
+    return results
+
+if __name__ == '__main__':
+    run()
+
+# vim:set expandtab tabstop=4 shiftwidth=4 softtabstop=4 nowrap:
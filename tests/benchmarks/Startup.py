@@ -0,0 +1,35 @@
+import os, subprocess, sys, time
+
+src = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'src')
+
+def measure(code, repeat=10):
+    """
+    Returns the best wall time of running code in a new interpreter.
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    best = None
+    for i in range(repeat):
+        start = time.time()
+        subprocess.check_call([sys.executable, '-c', code], env=env)
+        elapsed = time.time() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+def run():
+    results = {}
+    print("Startup: interpreter and imports")
+    interpreter = measure('pass')
+    results['interpreter'] = interpreter
+    print("  %-20s %9.3f ms" % ('interpreter', interpreter * 1000))
+    for name in ('java-config-2', 'gjl', 'depend-java-query'):
+        # Runs the imports and definitions of the script, but not its main program.
+        seconds = measure("path = %r\nexec(compile(open(path).read(), path, 'exec'), {'__name__': 'startup'})" % os.path.join(src, name))
+        results['imports/%s' % name] = seconds
+        print("  %-20s %9.3f ms %9.3f ms imports" % (name, seconds * 1000, (seconds - interpreter) * 1000))
+    return results
+
+if __name__ == '__main__':
+    run()
+
+# vim:set expandtab tabstop=4 shiftwidth=4 softtabstop=4 nowrap:
@@ -0,0 +1,43 @@
+__all__ = [ 'FileParser', 'Environment', 'Startup' ]
+from . import FileParser
+from . import Environment
+from . import Startup
+
+import json, os
+
+def load_baseline(path):
+    """
+    Returns the results stored in the JSON file path, or None.
+    """
+    try:
+        with open(path) as stream:
+            return json.load(stream)
+    except (IOError, ValueError):
+        return None
+
+def save_baseline(path, results):
+    directory = os.path.dirname(path)
+    if directory and not os.path.isdir(directory):
+        os.makedirs(directory)
+    with open(path, 'w') as stream:
+        json.dump(results, stream, indent=1, sort_keys=True)
+        stream.write('\n')
+
+def compare(results, baseline, tolerance=0.2):
+    """
+    Print how the results changed relative to the baseline and
+    return the names of those which got slower by more than tolerance.
+    """
+    slower = []
+    for name in sorted(results):
+        if name not in baseline:
+            continue
+        ratio = results[name] / baseline[name]
+        mark = ''
+        if ratio > 1 + tolerance:
+            mark = '  SLOWER'
+            slower.append(name)
+        print("  %-40s %6.2fx%s" % (name, ratio, mark))
+    return slower
+
+# vim:set expandtab tabstop=4 shiftwidth=4 softtabstop=4 nowrap:
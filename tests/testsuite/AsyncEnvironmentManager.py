@@ -0,0 +1,53 @@
+import asyncio, os, unittest
+
+from java_config_2.AsyncEnvironmentManager import AsyncEnvironmentManager
+from java_config_2.EnvironmentManager import EnvironmentManager
+
+class TestAsyncEnvironmentManager(unittest.TestCase):
+
+    def setUp(self):
+        self.root = os.path.join(os.path.dirname(__file__), 'test_env')
+        self.manager = AsyncEnvironmentManager(self.root)
+        self.manager.manager.set_active_vm(self.manager.manager.get_vm('ibm-jdk-bin-1.5'))
+
+    def test_get_package(self):
+        async def load():
+            return await asyncio.gather(*[self.manager.get_package('log4j') for i in range(8)])
+        pkgs = asyncio.run(load())
+        self.assertTrue(all(pkg is pkgs[0] for pkg in pkgs))
+        self.assertEqual(pkgs[0].name(), 'log4j')
+        self.assertEqual(self.manager.pending, {})
+
+    def test_coalesce(self):
+        calls = []
+        def load(name):
+            calls.append(name)
+            return name
+        async def load_all():
+            return await asyncio.gather(*[self.manager.coalesce(('test', 'a'), load, 'a') for i in range(4)])
+        self.assertEqual(asyncio.run(load_all()), ['a'] * 4)
+        self.assertEqual(calls, ['a'])
+
+    def test_build_dep_path(self):
+        em = EnvironmentManager(self.root)
+        em.set_active_vm(em.get_vm('ibm-jdk-bin-1.5'))
+        missing = set()
+        path = asyncio.run(self.manager.build_dep_path(['jdbc-mysql'], 'CLASSPATH', missing))
+        self.assertEqual(path, em.build_dep_path(['jdbc-mysql'], 'CLASSPATH', set()))
+        env = asyncio.run(self.manager.build_dep_env_vars(['jdbc-mysql'], set()))
+        self.assertEqual(env, em.build_dep_env_vars(['jdbc-mysql'], set()))
+
+    def test_vms(self):
+        vm = asyncio.run(self.manager.resolve_vm('>=virtual/jdk-1.5* java-virtuals/jaf'))
+        self.assertEqual(vm.name(), 'sun-jdk-1.6')
+        self.assertEqual(asyncio.run(self.manager.get_vm('sun-jdk-1.6')), vm)
+        self.assertTrue(asyncio.run(self.manager.version_satisfies('>=virtual/jdk-1.5', vm)))
+        self.assertEqual(asyncio.run(self.manager.get_lowest('>=virtual/jdk-1.4')), '1.4')
+
+    def test_needs_threadsafe(self):
+        self.assertRaises(ValueError, AsyncEnvironmentManager, manager=EnvironmentManager(self.root))
+
+if __name__ == '__main__':
+    unittest.main()
+
+# vim:set expandtab tabstop=4 shiftwidth=4 softtabstop=4 nowrap:
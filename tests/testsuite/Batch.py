@@ -0,0 +1,81 @@
+import io, json, os, unittest
+
+from java_config_2.Batch import Batch, parse_request, parse_depend_request
+from java_config_2.EnvironmentManager import EnvironmentManager
+from java_config_2.QueryHandler import QueryHandler
+
+class TestBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.em = EnvironmentManager(os.path.join(os.path.dirname(__file__), 'test_env'))
+        self.em.set_active_vm(self.em.get_vm('ibm-jdk-bin-1.5'))
+        self.handler = QueryHandler(self.em)
+
+    def run_batch(self, format, requests, parse=parse_request):
+        output = io.StringIO()
+        failed = Batch(self.handler, output, format, parse).run(io.StringIO(requests))
+        return failed, output.getvalue()
+
+    def test_parse_request(self):
+        self.assertEqual(parse_request('path packages=a,b query=CLASSPATH with_deps=true id=7\n'),
+                         {'op': 'path', 'id': '7', 'args': {'packages': ['a', 'b'], 'query': 'CLASSPATH', 'with_deps': True}})
+        self.assertEqual(parse_request('{"op": "active-vm"}'), {'op': 'active-vm'})
+        self.assertRaises(ValueError, parse_request, 'path packages')
+
+    def test_json(self):
+        failed, output = self.run_batch('json', """# comment
+{"op": "package-query", "args": {"package": "log4j", "var": "CLASSPATH"}, "id": 1}
+package-query package=missing var=CLASSPATH
+
+vm-query var=JAVA_HOME vm=sun-jdk-1.6
+active-vm
+""")
+        responses = [json.loads(line) for line in output.splitlines()]
+        self.assertEqual(failed, 1)
+        self.assertEqual(responses[0], {'status': 'ok', 'id': 1,
+                                        'result': {'name': 'log4j', 'value': '/usr/share/log4j/lib/log4j.jar'}})
+        self.assertEqual(responses[1]['error']['type'], 'UnexistingPackageError')
+        self.assertEqual(responses[2]['result'], '/opt/sun-jdk-1.6.0.06')
+        self.assertEqual(responses[3]['result'], 'ibm-jdk-bin-1.5')
+
+    def test_nul(self):
+        failed, output = self.run_batch('nul', "path packages=log4j query=CLASSPATH\nunknown\n")
+        self.assertEqual(failed, 1)
+        self.assertEqual(output, '0\t/usr/share/log4j/lib/log4j.jar\x001\tUnknown query: unknown\x00')
+
+    def test_unknown_vm(self):
+        failed, output = self.run_batch('text', "vm-query var=JAVA_HOME vm=nonexistent-vm\nactive-vm\n")
+        self.assertEqual(failed, 1)
+        self.assertEqual(output.splitlines(), ['1\tNo vm matching nonexistent-vm', '0\tibm-jdk-bin-1.5'])
+
+    def test_undefined(self):
+        failed, output = self.run_batch('json', "package-query package=log4j var=UNDEFINED\n")
+        response = json.loads(output)
+        self.assertEqual(failed, 1)
+        self.assertEqual(response['error']['type'], 'EnvironmentUndefinedError')
+        self.assertEqual(response['result'], {'name': 'log4j', 'value': None})
+
+    def test_parse_depend_request(self):
+        self.assertEqual(parse_depend_request('get-vm >=virtual/jdk-1.5 java-virtuals/jaf\n'),
+                         {'op': 'get-vm', 'args': {'depend': '>=virtual/jdk-1.5 java-virtuals/jaf', 'allow_build_only': True}})
+        self.assertEqual(parse_depend_request('is-sufficient'), {'op': 'is-sufficient', 'args': {'depend': ''}})
+        self.assertRaises(ValueError, parse_depend_request, 'path virtual/jdk:1.5')
+
+    def test_depend(self):
+        failed, output = self.run_batch('text', """get-vm >=virtual/jdk-1.5* java-virtuals/jaf
+get-lowest || ( =virtual/jdk-1.5 =virtual/jdk-1.4 )
+is-sufficient >=virtual/jdk-1.6
+parse-depend >=virtual/jdk-1.5 virtual/jre:1.6
+get-vm virtual/jdk:1.2 dev-java/test-package:0
+""", parse_depend_request)
+        lines = output.splitlines()
+        self.assertEqual(failed, 1)
+        self.assertEqual(lines[:4], ['0\tsun-jdk-1.6', '0\t1.4', '0\tfalse',
+                                     '0\tvirtual/jre-1.6 >=virtual/jdk-1.5'])
+        self.assertTrue(lines[4].startswith("1\tCouldn't find suitable VM."))
+        self.assertEqual(len(lines), 5)
+
+if __name__ == '__main__':
+    unittest.main()
+
+# vim:set expandtab tabstop=4 shiftwidth=4 softtabstop=4 nowrap:
@@ -0,0 +1,145 @@
+import os, shutil, tempfile, unittest
+
+from java_config_2.Cache import ConfigCache, ResolutionCache
+from java_config_2.EnvironmentManager import EnvironmentManager
+from java_config_2.VersionManager import VersionManager
+from java_config_2.FileParser import EnvFileParser
+from java_config_2.Errors import InvalidConfigError
+
+class TestConfigCache(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.env = os.path.join(self.dir, 'package.env')
+        shutil.copy(os.path.join(os.path.dirname(__file__),
+            'test_env/usr/share/log4j/package.env'), self.env)
+        self.path = os.path.join(self.dir, 'cache', 'config.cache')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_get_config(self):
+        cache = ConfigCache(self.path)
+        self.assertEqual(cache.get_config(self.env), EnvFileParser(self.env).get_config())
+        self.assertTrue(cache.dirty)
+
+    def test_save_and_load(self):
+        cache = ConfigCache(self.path)
+        config = cache.get_config(self.env)
+        self.assertTrue(cache.save())
+        self.assertFalse(cache.dirty)
+
+        cache = ConfigCache(self.path)
+        self.assertEqual(cache.get_config(self.env), config)
+        self.assertFalse(cache.dirty)
+
+    def test_changed_file(self):
+        cache = ConfigCache(self.path)
+        cache.get_config(self.env)
+        cache.save()
+
+        with open(self.env, 'a') as stream:
+            stream.write('EXTRA="value"\n')
+
+        cache = ConfigCache(self.path)
+        self.assertEqual(cache.get_config(self.env)['EXTRA'], 'value')
+        self.assertTrue(cache.dirty)
+
+    def test_missing_file(self):
+        cache = ConfigCache(self.path)
+        self.assertRaises(InvalidConfigError, cache.get_config, os.path.join(self.dir, 'missing'))
+
+    def test_corrupt_cache(self):
+        os.mkdir(os.path.dirname(self.path))
+        with open(self.path, 'w') as stream:
+            stream.write('garbage')
+        cache = ConfigCache(self.path)
+        self.assertEqual(cache.get_config(self.env)['CLASSPATH'], '/usr/share/log4j/lib/log4j.jar')
+
+    def test_writable_cache(self):
+        cache = ConfigCache(self.path)
+        cache.get_config(self.env)
+        cache.save()
+        os.chmod(self.path, 0o666)
+        cache = ConfigCache(self.path)
+        self.assertEqual(cache.get_entries(), {})
+
+        os.chmod(self.path, 0o644)
+        cache = ConfigCache(self.path)
+        self.assertEqual(list(cache.get_entries()), [self.env])
+
+class TestResolutionCache(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.root = os.path.join(self.dir, 'root')
+        shutil.copytree(os.path.join(os.path.dirname(__file__), 'test_env'), self.root, symlinks=True)
+        self.path = os.path.join(self.dir, 'resolution.cache')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def verman(self):
+        em = EnvironmentManager(self.root)
+        em.set_active_vm(em.get_vm('ibm-jdk-bin-1.5'))
+        em.resolution_cache = ResolutionCache(self.path)
+        return VersionManager(em)
+
+    def test_hits(self):
+        verman = self.verman()
+        cache = verman.env_manager.resolution_cache
+        for i in range(2):
+            self.assertEqual(verman.get_vm(">=virtual/jdk-1.5*  java-virtuals/jaf").name(), 'sun-jdk-1.6')
+            self.assertEqual(verman.get_vm("virtual/jdk:1.4", True).name(), 'blackdown-jdk-1.4.2')
+            self.assertRaises(Exception, verman.get_vm, 'virtual/jdk:1.4')
+        self.assertEqual(cache.stats(), {'hits': 3, 'misses': 3, 'entries': 3})
+
+    def test_persistent(self):
+        verman = self.verman()
+        verman.get_vm("virtual/jdk:1.5")
+        self.assertTrue(verman.env_manager.resolution_cache.save())
+
+        verman = self.verman()
+        self.assertEqual(verman.get_vm("virtual/jdk:1.5").name(), 'ibm-jdk-bin-1.5')
+        self.assertEqual(verman.env_manager.resolution_cache.hits, 1)
+
+    def test_many_strings(self):
+        verman = self.verman()
+        verman.get_vm(">=virtual/jdk-1.5* java-virtuals/jaf")
+        verman.get_vm("virtual/jdk:1.5")
+        self.assertTrue(verman.env_manager.resolution_cache.save())
+
+        verman = self.verman()
+        self.assertEqual(verman.get_vm(">=virtual/jdk-1.5* java-virtuals/jaf").name(), 'sun-jdk-1.6')
+        self.assertEqual(verman.get_vm("virtual/jdk:1.5").name(), 'ibm-jdk-bin-1.5')
+        self.assertEqual(verman.env_manager.resolution_cache.stats(), {'hits': 2, 'misses': 0, 'entries': 2})
+
+    def test_changed_virtual(self):
+        verman = self.verman()
+        verman.get_vm(">=virtual/jdk-1.5* java-virtuals/jaf")
+        verman.get_vm("virtual/jdk:1.5")
+        verman.env_manager.resolution_cache.save()
+
+        with open(os.path.join(self.root, 'usr/share/java-config-2/virtuals/jaf'), 'a') as stream:
+            stream.write('\n')
+        verman = self.verman()
+        verman.get_vm(">=virtual/jdk-1.5* java-virtuals/jaf")
+        verman.get_vm("virtual/jdk:1.5")
+        self.assertEqual(verman.env_manager.resolution_cache.hits, 1)
+        self.assertEqual(verman.env_manager.resolution_cache.misses, 1)
+
+    def test_changed_vms(self):
+        verman = self.verman()
+        verman.get_vm("virtual/jdk:1.5")
+        verman.env_manager.resolution_cache.save()
+
+        vms = os.path.join(self.root, 'usr/share/java-config-2/vm')
+        shutil.copy(os.path.join(vms, 'ibm-jdk-bin-1.5'), os.path.join(vms, 'ibm-jdk-bin-1.5-copy'))
+        verman = self.verman()
+        verman.get_vm("virtual/jdk:1.5")
+        self.assertEqual(verman.env_manager.resolution_cache.misses, 1)
+
+if __name__ == '__main__':
+    unittest.main()
+
+# vim:set expandtab tabstop=4 shiftwidth=4 softtabstop=4 nowrap:
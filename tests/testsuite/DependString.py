@@ -0,0 +1,42 @@
+import unittest
+
+from java_config_2.DependString import DependString, parse_depend_string
+
+class TestDependString(unittest.TestCase):
+
+    nested = "java? ( || ( =virtual/jdk-1.6 doc? ( =virtual/jdk-1.5 ) ) ) !java? ( dev-java/ant-core:0 ) java-virtuals/jaf:0"
+
+    def test_tree(self):
+        tree = DependString(self.nested).tree
+        self.assertEqual(tree, [
+            ('use', 'java', False, [
+                ('any', [('atom', '=virtual/jdk-1.6'),
+                         ('use', 'doc', False, [('atom', '=virtual/jdk-1.5')])])]),
+            ('use', 'java', True, [('atom', 'dev-java/ant-core:0')]),
+            ('atom', 'java-virtuals/jaf:0')])
+
+    def test_reduce(self):
+        self.assertEqual(DependString(self.nested, 'java').text, '|| =virtual/jdk-1.6 java-virtuals/jaf:0')
+        self.assertEqual(DependString(self.nested, 'java doc').text, '|| =virtual/jdk-1.6 =virtual/jdk-1.5 java-virtuals/jaf:0')
+        self.assertEqual(DependString(self.nested, '').text, 'dev-java/ant-core:0 java-virtuals/jaf:0')
+        self.assertEqual(DependString(self.nested).text, self.nested)
+
+    def test_projections(self):
+        parsed = DependString(self.nested, 'java doc')
+        self.assertEqual([atom['version'] for atom in parsed.vm_atoms], ['1.6', '1.5'])
+        self.assertEqual(parsed.virtuals, 'jaf')
+        self.assertEqual([package['pkg'] for package in parsed.packages], ['jaf'])
+        self.assertEqual([package['pkg'] for package in DependString(self.nested).packages], ['ant-core', 'jaf'])
+
+    def test_unbalanced(self):
+        self.assertEqual(DependString(") java? ( virtual/jdk:1.5", 'java').text, 'virtual/jdk:1.5')
+
+    def test_cached(self):
+        parsed = parse_depend_string(self.nested, 'java')
+        self.assertTrue(parse_depend_string(self.nested, 'java') is parsed)
+        self.assertFalse(parse_depend_string(self.nested, 'doc') is parsed)
+
+if __name__ == '__main__':
+    unittest.main()
+
+# vim:set expandtab tabstop=4 shiftwidth=4 softtabstop=4 nowrap:
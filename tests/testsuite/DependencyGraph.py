@@ -0,0 +1,63 @@
+import os, shutil, tempfile, unittest
+
+from java_config_2.EnvironmentManager import EnvironmentManager
+
+class TestDependencyGraph(unittest.TestCase):
+
+    packages = {
+        'app': 'CLASSPATH="/usr/share/app/lib/app.jar"\nDEPEND="lib-a:b.jar@lib-b:missing"\n',
+        'lib-a': 'CLASSPATH="/usr/share/lib-a/lib/a.jar"\nDEPEND="lib-b"\nOPTIONAL_DEPEND="not-installed"\n',
+        'lib-b': 'CLASSPATH="/usr/share/lib-b/lib/b.jar:/usr/share/lib-b/lib/c.jar"\nDEPEND="lib-a"\n',
+    }
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        for name, content in self.packages.items():
+            os.makedirs(os.path.join(self.root, 'usr/share', name))
+            with open(os.path.join(self.root, 'usr/share', name, 'package.env'), 'w') as stream:
+                stream.write(content)
+        self.em = EnvironmentManager(self.root)
+        self.graph = self.em.get_dependency_graph()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_edges(self):
+        edges = self.graph.edges(self.em.get_package('app'))
+        self.assertEqual([(dep, p and p.name()) for dep, p in edges],
+                         [(['lib-a'], 'lib-a'), (['b.jar', 'lib-b'], 'lib-b'), (['missing'], None)])
+        self.assertTrue(self.graph.edges(self.em.get_package('app')) is edges)
+
+    def test_closure(self):
+        order, missing = self.graph.closure(self.em.get_package('app'))
+        self.assertEqual([p.name() for p in order], ['app', 'lib-a', 'lib-b'])
+        self.assertEqual(missing, set(['missing']))
+        order, missing = self.graph.closure(self.em.get_package('lib-b'))
+        self.assertEqual([p.name() for p in order], ['lib-b', 'lib-a'])
+        self.assertEqual(missing, set())
+
+    def test_walk(self):
+        pkgs = [self.em.get_package('lib-b'), self.em.get_package('app')]
+        self.assertEqual([p.name() for p in self.graph.walk(pkgs)], ['lib-b', 'lib-a', 'app'])
+        self.assertEqual(self.graph.missing(pkgs), set(['missing']))
+
+    def test_build_dep_path(self):
+        missing = set()
+        path = self.em.build_dep_path(['app'], 'CLASSPATH', missing)
+        self.assertEqual(path, ['/usr/share/app/lib/app.jar', '/usr/share/lib-a/lib/a.jar',
+                                '/usr/share/lib-b/lib/b.jar', '/usr/share/lib-b/lib/c.jar'])
+        self.assertEqual(missing, set(['missing']))
+
+    def test_reset(self):
+        self.em.set_active_vm(None)
+        self.assertTrue(self.em.get_dependency_graph() is self.graph)
+        self.em.load_packages()
+        self.assertFalse(self.em.get_dependency_graph() is self.graph)
+        graph = self.em.get_dependency_graph()
+        self.em.invalidate_dependency_graphs()
+        self.assertFalse(self.em.get_dependency_graph() is graph)
+
+if __name__ == '__main__':
+    unittest.main()
+
+# vim:set expandtab tabstop=4 shiftwidth=4 softtabstop=4 nowrap:
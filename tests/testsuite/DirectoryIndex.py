@@ -0,0 +1,50 @@
+import os, shutil, tempfile, unittest
+
+from java_config_2.EnvironmentManager import EnvironmentManager
+from java_config_2.Errors import UnexistingPackageError
+
+class TestDirectoryIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        for name in ('log4j', 'ant-core', '.hidden'):
+            os.makedirs(os.path.join(self.root, 'usr/share', name))
+            with open(os.path.join(self.root, 'usr/share', name, 'package.env'), 'w') as stream:
+                stream.write('CLASSPATH="/usr/share/%s/lib/%s.jar"\n' % (name, name))
+        os.makedirs(os.path.join(self.root, 'usr/share/man'))
+        os.makedirs(os.path.join(self.root, 'usr/share/java-config-2/virtuals'))
+        with open(os.path.join(self.root, 'usr/share/java-config-2/virtuals/jaf'), 'w') as stream:
+            stream.write('PROVIDERS="log4j"\n')
+        os.makedirs(os.path.join(self.root, 'etc/java-config-2'))
+        open(os.path.join(self.root, 'etc/java-config-2/virtuals'), 'w').close()
+        self.em = EnvironmentManager(self.root)
+        self.index = self.em.get_directory_index()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_package_files(self):
+        self.assertEqual(self.index.package_file('log4j'), self.root + '/usr/share/log4j/package.env')
+        self.assertEqual(self.index.package_file('man'), None)
+        self.assertEqual(self.index.package_file('absent'), None)
+        self.assertEqual([os.path.basename(os.path.dirname(f)) for f in self.index.all_package_files()],
+                         ['ant-core', 'log4j'])
+
+    def test_virtuals(self):
+        self.assertEqual(self.index.virtual_files(), [self.root + '/usr/share/java-config-2/virtuals/jaf'])
+        self.assertEqual(self.em.get_package('jaf').get_packages(), ['log4j'])
+
+    def test_missing(self):
+        self.assertRaises(UnexistingPackageError, self.em.get_package, 'absent')
+        self.assertTrue('absent' in self.index.missing)
+        os.makedirs(os.path.join(self.root, 'usr/share/absent'))
+        self.assertRaises(UnexistingPackageError, self.em.get_package, 'absent')
+
+    def test_load_packages(self):
+        self.em.load_packages()
+        self.assertEqual(sorted(self.em.get_packages()), ['ant-core', 'jaf', 'log4j'])
+
+if __name__ == '__main__':
+    unittest.main()
+
+# vim:set expandtab tabstop=4 shiftwidth=4 softtabstop=4 nowrap:
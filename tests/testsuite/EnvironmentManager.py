@@ -1,4 +1,4 @@
-import os, unittest
+import operator, os, unittest
 
 from java_config_2.EnvironmentManager import EnvironmentManager
 
@@ -13,12 +13,133 @@ class TestEnvironmentManager(unittest.TestCase):
         self.em.load_packages()
         self.assertEquals(len(self.em.get_packages()), 11)
 
+    def test_load_threaded(self):
+        em = EnvironmentManager(os.path.join(os.path.dirname(__file__), 'test_env'), threads=4)
+        em.parallel_threshold = 1
+        em.load_vms()
+        self.assertEqual([vm.name() for vm in em.get_virtual_machines().values()],
+                         [vm.name() for vm in self.em.get_virtual_machines().values()])
+        em.load_packages()
+        self.assertEqual(sorted(em.get_packages()), sorted(self.em.get_packages()))
+
+    def test_threads_from_environment(self):
+        saved = os.environ.get('JAVA_CONFIG_THREADS')
+        try:
+            for value, threads in (('4', 4), ('auto', EnvironmentManager.default_threads), ('0', 1), ('-2', 1)):
+                os.environ['JAVA_CONFIG_THREADS'] = value
+                self.assertEqual(EnvironmentManager(os.path.join(os.path.dirname(__file__), 'test_env')).threads, threads)
+        finally:
+            if saved is None:
+                del os.environ['JAVA_CONFIG_THREADS']
+            else:
+                os.environ['JAVA_CONFIG_THREADS'] = saved
+
     def test_get_package(self):
         self.em.get_package('ant-cores')
 
     def test_build_dep_path(self):
         self.assertTrue( len(self.em.build_dep_path(["jdbc"], "CLASSPATH", set())) > 2)
 
+    def test_iter_packages(self):
+        em = EnvironmentManager(os.path.join(os.path.dirname(__file__), 'test_env'))
+        em.parallel_threshold = 2
+        names = [pkg.name() for pkg in em.iter_packages()]
+        self.assertEqual(names, list(self.em.get_packages()))
+        self.assertEqual(sorted([pkg.name() for pkg in em.iter_packages(False)]), sorted(names))
+        self.assertEqual(em.packages, {})
+
+    def active_vm(self, gentoo_vm):
+        em = EnvironmentManager(os.path.join(os.path.dirname(__file__), 'test_env'))
+        saved = os.environ.get('GENTOO_VM')
+        os.environ['GENTOO_VM'] = gentoo_vm
+        try:
+            return em, em.get_active_vm()
+        finally:
+            if saved is None:
+                del os.environ['GENTOO_VM']
+            else:
+                os.environ['GENTOO_VM'] = saved
+
+    def test_active_vm_fast_path(self):
+        em, vm = self.active_vm('sun-jdk-1.6')
+        self.assertEqual(vm.name(), 'sun-jdk-1.6')
+        self.assertEqual(em.virtual_machines, None)
+        # Loading all vms keeps the active one
+        self.assertTrue(em.get_vm('sun-jdk-1.6') is vm)
+
+    def test_active_vm_prefix(self):
+        em, vm = self.active_vm('sun-jdk')
+        self.assertEqual(vm.name(), 'sun-jdk-1.7')
+        self.assertNotEqual(em.virtual_machines, None)
+
+    def test_threadsafe_load_once(self):
+        from concurrent.futures import ThreadPoolExecutor
+        em = EnvironmentManager(os.path.join(os.path.dirname(__file__), 'test_env'), threadsafe=True)
+        names = ['log4j', 'jdbc-mysql', 'ant-cores'] * 16
+        with ThreadPoolExecutor(8) as pool:
+            pkgs = list(pool.map(em.get_package, names))
+            registries = list(pool.map(lambda i: em.get_vm_registry(), range(16)))
+        for name, pkg in zip(names, pkgs):
+            self.assertTrue(pkg is em.get_package(name))
+        self.assertTrue(all(registry is registries[0] for registry in registries))
+
+    def test_threadsafe_load_all(self):
+        import threading
+        for i in range(8):
+            em = EnvironmentManager(os.path.join(os.path.dirname(__file__), 'test_env'), threadsafe=True)
+            names = ['log4j', 'jdbc-mysql', 'jdbc', 'jmx']
+            barrier = threading.Barrier(len(names) + 1)
+            found = {}
+            def get_package(name):
+                barrier.wait()
+                found[name] = em.get_package(name)
+            def get_packages():
+                barrier.wait()
+                em.get_packages()
+            threads = [threading.Thread(target=get_package, args=(name,)) for name in names]
+            threads.append(threading.Thread(target=get_packages))
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            for name in names:
+                self.assertTrue(found[name] is em.get_packages()[name])
+            for name in ('jdbc', 'jmx'):
+                self.assertTrue(em.virtuals[name] is em.packages[name])
+
+    def test_using_vm(self):
+        import threading
+        em = EnvironmentManager(os.path.join(os.path.dirname(__file__), 'test_env'), threadsafe=True)
+        ibm, sun = em.get_vm('ibm-jdk-bin-1.5'), em.get_vm('sun-jdk-1.6')
+        em.set_active_vm(ibm)
+        seen = []
+        with em.using_vm(sun):
+            self.assertTrue(em.get_active_vm() is sun)
+            thread = threading.Thread(target=lambda: seen.append(em.get_active_vm()))
+            thread.start()
+            thread.join()
+        self.assertEqual(seen, [ibm])
+        self.assertTrue(em.get_active_vm() is ibm)
+
+        path = em.build_dep_path(['jdbc-mysql'], 'CLASSPATH', set(), vm=sun)
+        self.assertEqual(path, self.em.build_dep_path(['jdbc-mysql'], 'CLASSPATH', set()))
+        self.assertTrue(em.get_active_vm() is ibm)
+
+    def test_snapshot(self):
+        from java_config_2.Errors import UnexistingPackageError
+        em = EnvironmentManager(os.path.join(os.path.dirname(__file__), 'test_env'))
+        snapshot = em.snapshot()
+        self.assertEqual(sorted(snapshot.get_packages()), sorted(self.em.get_packages()))
+        self.assertTrue(all(pkg.is_parsed() for pkg in snapshot.get_packages().values()))
+        self.assertEqual(snapshot.get_vm('sun-jdk-1.6').name(), 'sun-jdk-1.6')
+        self.assertEqual(snapshot.query_packages(['log4j'], 'CLASSPATH'), ['/usr/share/log4j/lib/log4j.jar'])
+        self.assertRaises(UnexistingPackageError, snapshot.get_package, 'missing')
+        self.assertRaises(TypeError, operator.setitem, snapshot.packages, 'missing', None)
+        self.assertRaises(AttributeError, setattr, snapshot, 'packages', {})
+        # Loading again does not change the snapshot
+        em.load_vms()
+        self.assertFalse(snapshot.vm_registry is em.get_vm_registry())
+
 if __name__ == '__main__':
     unittest.main()
 
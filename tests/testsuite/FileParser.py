@@ -0,0 +1,62 @@
+import os, shutil, tempfile, unittest
+
+from java_config_2.FileParser import EnvFileParser, PrefsFileParser, parse_env_files
+from java_config_2.Errors import InvalidConfigError
+
+class TestFileParser(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def write(self, name, content):
+        path = os.path.join(self.dir, name)
+        with open(path, 'w') as stream:
+            stream.write(content)
+        return path
+
+    def test_expansion(self):
+        config = EnvFileParser(self.write('vm', """# A comment
+JAVA_HOME=/opt/jdk
+PATH="${JAVA_HOME}/bin:${JAVA_HOME}/jre/bin"
+EMPTY=
+QUOTED=""
+""")).get_config()
+        self.assertEqual(config['PATH'], '/opt/jdk/bin:/opt/jdk/jre/bin')
+        self.assertEqual(config['QUOTED'], '')
+        self.assertFalse('EMPTY' in config)
+
+    def test_undefined_and_self_reference(self):
+        config = EnvFileParser(self.write('env', """CLASSPATH="${CLASSPATH}:a.jar"
+CLASSPATH="${CLASSPATH}:b.jar"
+OTHER="x}${UNDEFINED}y"
+BROKEN="${UNTERMINATED"
+""")).get_config()
+        self.assertEqual(config['CLASSPATH'], ':a.jar:b.jar')
+        self.assertEqual(config['OTHER'], 'x}y')
+        self.assertEqual(config['BROKEN'], '${UNTERMINATED')
+
+    def test_lines_without_value(self):
+        config = EnvFileParser(self.write('env', "garbage\nKEY=value=with=equals\n")).get_config()
+        self.assertEqual(config, {'KEY': 'value=with=equals'})
+
+    def test_prefs(self):
+        config = PrefsFileParser(self.write('prefs', "# Supported JDKs\n*= icedtea6 icedtea7\n")).get_config()
+        self.assertEqual(config, [['*', ['icedtea6', 'icedtea7']]])
+
+    def test_invalid(self):
+        self.assertRaises(InvalidConfigError, EnvFileParser, os.path.join(self.dir, 'missing'))
+        self.assertRaises(InvalidConfigError, EnvFileParser, self.dir)
+
+    def test_parse_env_files(self):
+        a = self.write('a', 'A="1"\n')
+        b = self.write('b', 'B="${A}2"\n')
+        configs = parse_env_files([a, b, os.path.join(self.dir, 'missing')])
+        self.assertEqual(configs, {a: {'A': '1'}, b: {'B': '2'}})
+
+if __name__ == '__main__':
+    unittest.main()
+
+# vim:set expandtab tabstop=4 shiftwidth=4 softtabstop=4 nowrap:
@@ -0,0 +1,67 @@
+import os, shutil, subprocess, tempfile, time, unittest
+
+from java_config_2.LaunchPlan import LaunchPlan
+
+class TestLaunchPlan(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'launcher', 'test-package')
+        self.env = os.path.join(self.dir, 'package.env')
+        with open(self.env, 'w') as stream:
+            stream.write('CLASSPATH="/usr/share/test-package/lib/test.jar"\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def source(self, script):
+        return subprocess.check_output(['bash', '-c', 'source "$1"; ' + script, 'bash', self.path]).decode('utf-8')
+
+    def test_write(self):
+        results = 'gjl_args=" -classpath /usr/share/it\'s/test.jar";\ngjl_starte="-jar test.jar"'
+        self.assertTrue(LaunchPlan(self.path).write('main=|jar=test.jar', results, [self.env], time.time()))
+
+        self.assertEqual(self.source('echo "${gjl_plan_key}"'), 'main=|jar=test.jar\n')
+        self.assertEqual(self.source('echo "${gjl_plan_files[@]}"'), self.env + '\n')
+        self.assertEqual(self.source('echo "${gjl_plan_results}"'), results + '\n')
+
+    def launch(self, env):
+        """
+        Runs launcher.bash for test-package with fake java and gjl
+        commands, returns the java command line it runs.
+        """
+        bin = os.path.join(self.dir, 'bin')
+        if not os.path.isdir(bin):
+            os.mkdir(bin)
+            for name, script in (('java', 'echo java "$@"'), ('gjl', "echo 'gjl_args=\"-cp fresh\"'")):
+                with open(os.path.join(bin, name), 'w') as stream:
+                    stream.write('#!/bin/bash\n%s\n' % script)
+                os.chmod(os.path.join(bin, name), 0o755)
+        launcher = os.path.join(os.path.dirname(__file__), '..', '..', 'src', 'launcher.bash')
+        env = dict(env, PATH=bin + ':' + os.environ['PATH'], HOME=self.dir, XDG_CACHE_HOME=self.dir,
+                   gjl_package='test-package', gjl_main='Main')
+        return subprocess.check_output(['bash', launcher], env=env).decode('utf-8')
+
+    def test_launcher(self):
+        self.path = os.path.join(self.dir, 'java-config-2', 'launcher', 'test-package')
+        LaunchPlan(self.path).write('main=Main|jar=|vm=|cp=|lp=|jlp=', 'gjl_args="-cp planned"', [self.env], time.time())
+        self.assertEqual(self.launch({}), 'java -cp planned Main\n')
+
+        # A plan for another environment is not used
+        self.assertEqual(self.launch({'CLASSPATH': '/tmp'}), 'java -cp fresh Main\n')
+
+        # Nor is one older than one of its files
+        later = time.time() + 10
+        os.utime(self.env, (later, later))
+        self.assertEqual(self.launch({}), 'java -cp fresh Main\n')
+
+    def test_mtime(self):
+        started = time.time() - 60
+        LaunchPlan(self.path).write('', '', [self.env], started)
+        self.assertEqual(int(os.stat(self.path).st_mtime), int(started))
+        self.assertEqual(self.source('[[ ${gjl_plan_files[0]} -nt "$1" ]] && echo stale'), 'stale\n')
+
+if __name__ == '__main__':
+    unittest.main()
+
+# vim:set expandtab tabstop=4 shiftwidth=4 softtabstop=4 nowrap:
@@ -0,0 +1,41 @@
+import io, unittest
+
+from java_config_2.OutputFormatter import OutputFormatter
+
+class TestOutputFormatter(unittest.TestCase):
+
+    def setUp(self):
+        self.printer = OutputFormatter(True, True)
+        self.saved = self.printer.colorOutput
+
+    def tearDown(self):
+        self.printer.setColorOutputStatus(self.saved)
+
+    def lines(self, messages, color):
+        self.printer.setColorOutputStatus(color)
+        stream = io.StringIO()
+        self.printer._printLines(messages, stream)
+        return stream.getvalue()
+
+    def test_colors(self):
+        messages = ['%H%BJava%$', '100% sure', 'a%%b', 'end%']
+        self.assertEqual(self.lines(messages, True),
+                         '\x1b[01m\x1b[34;06mJava\x1b[0m\n100% sure\na%b\nend\n')
+        self.assertEqual(self.lines(messages, False), 'Java\n100% sure\na%b\nend\n')
+
+    def test_chunks(self):
+        messages = ['line %d' % i for i in range(self.printer.chunkLines * 2 + 1)]
+        self.assertEqual(self.lines(iter(messages), False), '\n'.join(messages) + '\n')
+
+    def test_error(self):
+        def messages():
+            yield 'first'
+            raise RuntimeError()
+        stream = io.StringIO()
+        self.assertRaises(RuntimeError, self.printer._printLines, messages(), stream)
+        self.assertEqual(stream.getvalue(), 'first\n')
+
+if __name__ == '__main__':
+    unittest.main()
+
+# vim:set expandtab tabstop=4 shiftwidth=4 softtabstop=4 nowrap:
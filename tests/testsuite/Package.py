@@ -1,4 +1,4 @@
-import os, unittest
+import operator, os, unittest
 
 from java_config_2.EnvironmentManager import EnvironmentManager
 from java_config_2.Package import Package
@@ -20,6 +20,25 @@ class TestPackage(unittest.TestCase):
         self.assertTrue(self.ant.query('JAVADOC_PATH'))
         self.assertFalse(self.ant.query('VAR_SHOULD_NOT_EXIST'))
 
+    def test_lazy(self):
+        em = EnvironmentManager(os.path.join(os.path.dirname(__file__), 'test_env'))
+        em.load_packages()
+        log4j = em.get_package('log4j')
+        self.assertFalse(log4j.is_parsed())
+        self.assertEqual(log4j.classpath(), '/usr/share/log4j/lib/log4j.jar')
+        self.assertTrue(log4j.is_parsed())
+
+        em.parse_packages()
+        self.assertTrue(all(pkg.is_parsed() for pkg in em.get_packages().values()))
+
+    def test_compact(self):
+        self.assertRaises(AttributeError, setattr, self.ant, 'extra', None)
+        config = self.ant.parse()
+        self.assertRaises(TypeError, operator.setitem, config, 'CLASSPATH', '')
+        other = Package('other', self.ant.file())
+        for key in other.parse():
+            self.assertTrue([k for k in self.ant.parse() if k is key])
+
 if __name__ == '__main__':
     unittest.main()
 
@@ -0,0 +1,30 @@
+import unittest
+
+from java_config_2.PathBuilder import PathBuilder, normpath
+
+class TestPathBuilder(unittest.TestCase):
+
+    def test_normpath(self):
+        self.assertEqual(normpath('//usr/share/foo/'), '/usr/share/foo')
+        self.assertEqual(normpath('/usr/share/../lib/./a.jar'), '/usr/lib/a.jar')
+
+    def test_order_and_duplicates(self):
+        path = PathBuilder('/a.jar::/b.jar')
+        path.extend(['/c.jar', '//a.jar', '/b.jar/', ''])
+        path.extend('/d.jar:/c.jar')
+        self.assertTrue(path.add('/e.jar'))
+        self.assertFalse(path.add('/usr/../e.jar'))
+        self.assertEqual(path.list(), ['/a.jar', '/b.jar', '/c.jar', '/d.jar', '/e.jar'])
+        self.assertEqual(str(path), '/a.jar:/b.jar:/c.jar:/d.jar:/e.jar')
+        self.assertEqual(len(path), 5)
+
+    def test_contains(self):
+        path = PathBuilder(['/usr/share/foo/lib/foo.jar'])
+        self.assertTrue('//usr/share/foo/lib/foo.jar' in path)
+        self.assertFalse('/usr/share/foo/lib/bar.jar' in path)
+        self.assertFalse('' in path)
+
+if __name__ == '__main__':
+    unittest.main()
+
+# vim:set expandtab tabstop=4 shiftwidth=4 softtabstop=4 nowrap:
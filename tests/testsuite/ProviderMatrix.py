@@ -0,0 +1,39 @@
+import os, unittest
+
+from java_config_2.EnvironmentManager import EnvironmentManager
+
+class TestProviderMatrix(unittest.TestCase):
+
+    def setUp(self):
+        self.em = EnvironmentManager(os.path.join(os.path.dirname(__file__), 'test_env'))
+        self.em.set_active_vm(self.em.get_vm('ibm-jdk-bin-1.5'))
+        self.matrix = self.em.get_provider_matrix()
+
+    def providers(self, virtuals):
+        vms = self.matrix.satisfying(virtuals)
+        return [vm.name() for vm in self.em.find_vm('') if self.matrix.provides(vms, vm)]
+
+    def test_vm_providers(self):
+        self.assertEqual(self.providers('jaf'), ['sun-jdk-1.6'])
+        self.assertEqual(self.providers('jmx2'), ['ibm-jdk-bin-1.5', 'sun-jdk-1.6', 'sun-jdk-1.7', 'sun-jre-bin-1.6'])
+
+    def test_package_providers(self):
+        self.assertEqual(len(self.providers('jdbc')), 5)
+        self.assertEqual(len(self.providers('')), 5)
+
+    def test_intersection(self):
+        self.assertEqual(self.providers('jaf jdbc jmx2'), ['sun-jdk-1.6'])
+
+    def test_have_provider(self):
+        self.assertTrue(self.em.have_provider('jaf', self.em.get_vm('sun-jdk-1.6'), None))
+        self.assertFalse(self.em.have_provider('jaf', self.em.get_vm('sun-jdk-1.7'), None))
+        self.assertEqual(self.em.get_active_vm().name(), 'ibm-jdk-bin-1.5')
+
+    def test_reset(self):
+        self.em.load_packages()
+        self.assertFalse(self.em.get_provider_matrix() is self.matrix)
+
+if __name__ == '__main__':
+    unittest.main()
+
+# vim:set expandtab tabstop=4 shiftwidth=4 softtabstop=4 nowrap:
@@ -0,0 +1,66 @@
+import os, shutil, tempfile, threading, unittest
+
+from java_config_2.Server import Server
+from java_config_2.Client import Client
+from java_config_2.Errors import ServerUnavailableError, UnexistingPackageError
+
+class TestServer(unittest.TestCase):
+
+    def setUp(self):
+        self.root = os.path.join(os.path.dirname(__file__), 'test_env')
+        self.dir = tempfile.mkdtemp()
+        self.socket = os.path.join(self.dir, 'socket')
+        self.server = Server(self.socket, [self.root])
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.05,))
+        self.thread.start()
+        self.client = Client(self.root, '', self.socket)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        shutil.rmtree(self.dir)
+
+    def test_path(self):
+        result = self.client.query('path', packages=['jdbc-mysql'], query='CLASSPATH', with_deps=True, vm='sun-jdk-1.6')
+        self.assertEqual(result['path'][0], '/usr/share/jdbc-mysql/lib/jdbc-mysql.jar')
+        self.assertTrue('/usr/share/log4j/lib/log4j.jar' in result['path'])
+        self.assertEqual(result['missing'], [])
+
+    def test_vm_query(self):
+        self.assertEqual(self.client.query('vm-query', var='JAVA_HOME', vm='sun-jdk-1.6'), '/opt/sun-jdk-1.6.0.06')
+
+    def test_error(self):
+        self.assertRaises(UnexistingPackageError, self.client.query, 'package-query', package='missing', var='CLASSPATH')
+
+    def test_not_an_object(self):
+        import json, socket
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(self.socket)
+        stream = sock.makefile('rwb')
+        try:
+            for request in (b'[]\n', b'"x"\n', b'1\n'):
+                stream.write(request)
+                stream.flush()
+                self.assertEqual(json.loads(stream.readline().decode('utf-8'))['status'], 'error')
+        finally:
+            stream.close()
+            sock.close()
+        self.assertEqual(self.client.query('active-vm', vm='sun-jdk-1.6'), 'sun-jdk-1.6')
+
+    def test_socket_mode(self):
+        self.assertEqual(os.stat(self.socket).st_mode & 0o777, 0o600)
+
+    def test_refused(self):
+        client = Client('/somewhere/else', '', self.socket)
+        self.assertRaises(ServerUnavailableError, client.query, 'active-vm')
+
+    def test_unavailable(self):
+        client = Client(self.root, '', os.path.join(self.dir, 'missing'))
+        self.assertRaises(ServerUnavailableError, client.query, 'active-vm')
+
+if __name__ == '__main__':
+    unittest.main()
+
+# vim:set expandtab tabstop=4 shiftwidth=4 softtabstop=4 nowrap:
@@ -0,0 +1,49 @@
+import os, subprocess, sys, unittest
+
+src = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'src')
+
+# Modules the commands must not import before they know they need
+# them, most of them take longer to import than answering a query.
+deferred = [ 'subprocess', 'glob', 'tempfile', 'pickle', 'threading',
+             'java_config_2.QueryHandler', 'java_config_2.VersionManager',
+             'java_config_2.Batch', 'java_config_2.LaunchPlan' ]
+
+def imported(code):
+    """
+    Returns the modules imported by running code in a new interpreter.
+    """
+    code += "\nimport sys\nprint('\\n'.join(sys.modules))"
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    output = subprocess.check_output([sys.executable, '-c', code], env=env)
+    return set(output.decode('utf-8').split())
+
+def imported_by_script(name):
+    # Runs the imports and definitions of the script, but not its main program.
+    return imported("path = %r\nexec(compile(open(path).read(), path, 'exec'), {'__name__': 'startup'})" % os.path.join(src, name))
+
+class TestStartup(unittest.TestCase):
+
+    def assertDeferred(self, modules, extra=()):
+        self.assertEqual(sorted(modules.intersection(deferred + list(extra))), [])
+
+    def test_library(self):
+        modules = imported("import java_config_2.EnvironmentManager")
+        self.assertDeferred(modules, ['re', 'optparse'])
+
+    def test_batch(self):
+        modules = imported("import java_config_2.Batch")
+        self.assertEqual(sorted(modules.intersection(['socketserver', 'threading', 'java_config_2.Server'])), [])
+
+    def test_java_config(self):
+        self.assertDeferred(imported_by_script('java-config-2'))
+
+    def test_gjl(self):
+        self.assertDeferred(imported_by_script('gjl'))
+
+    def test_depend_java_query(self):
+        self.assertDeferred(imported_by_script('depend-java-query'), ['java_config_2.EnvironmentManager'])
+
+if __name__ == '__main__':
+    unittest.main()
+
+# vim:set expandtab tabstop=4 shiftwidth=4 softtabstop=4 nowrap:
@@ -0,0 +1,61 @@
+import os, shutil, tempfile, unittest
+
+from java_config_2 import Trace
+from java_config_2.EnvironmentManager import EnvironmentManager
+
+class TestTrace(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.saved = (Trace.enabled, Trace.output)
+        Trace.phases.clear()
+        Trace.counters.clear()
+
+    def tearDown(self):
+        Trace.enabled, Trace.output = self.saved
+        Trace.phases.clear()
+        Trace.counters.clear()
+        shutil.rmtree(self.dir)
+
+    def test_disabled(self):
+        Trace.enabled = False
+        with Trace.phase('nothing'):
+            Trace.count('nothing')
+        self.assertEqual(Trace.phases, {})
+        self.assertEqual(Trace.counters, {})
+
+    def test_counters(self):
+        Trace.enable(os.path.join(self.dir, 'trace'))
+        em = EnvironmentManager(os.path.join(os.path.dirname(__file__), 'test_env'))
+        em.set_active_vm(em.get_vm('ibm-jdk-bin-1.5'))
+        em.build_dep_path(['jdbc-mysql'], 'CLASSPATH', set())
+
+        self.assertEqual(Trace.phases['load_vms'][0], 1)
+        self.assertEqual(Trace.phases['dependency walk'][0], 1)
+        self.assertEqual(Trace.counters['packages loaded'], 3)
+        self.assertEqual(Trace.counters['files opened'], Trace.phases['parse env files'][0])
+        self.assertTrue(Trace.counters['bytes parsed'] > 0)
+
+    def test_destination(self):
+        for value in (None, '', '0', 'false', 'No', 'off'):
+            self.assertEqual(Trace.destination(value), None)
+        for value in ('1', 'yes', 'trace'):
+            self.assertEqual(Trace.destination(value), '1')
+        self.assertEqual(Trace.destination('./trace'), './trace')
+        self.assertEqual(Trace.destination('/tmp/trace'), '/tmp/trace')
+
+    def test_report(self):
+        path = os.path.join(self.dir, 'trace')
+        Trace.enable(path)
+        Trace.mark('imports')
+        Trace.count('files opened', 2)
+        Trace.report()
+        with open(path) as stream:
+            lines = stream.read().splitlines()
+        self.assertTrue(lines[0].startswith('java-config trace of'))
+        self.assertTrue([line for line in lines if line.split() == ['files', 'opened', '2']])
+
+if __name__ == '__main__':
+    unittest.main()
+
+# vim:set expandtab tabstop=4 shiftwidth=4 softtabstop=4 nowrap:
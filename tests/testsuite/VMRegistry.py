@@ -0,0 +1,39 @@
+import os, unittest
+
+from java_config_2.EnvironmentManager import EnvironmentManager
+
+class TestVMRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.em = EnvironmentManager(os.path.join(os.path.dirname(__file__), 'test_env'))
+        self.registry = self.em.get_vm_registry()
+
+    def names(self, vms):
+        return [vm.name() for vm in vms]
+
+    def test_get(self):
+        self.assertEqual(self.registry.get('3').name(), 'sun-jdk-1.6')
+        self.assertEqual(self.registry.get(3).name(), 'sun-jdk-1.6')
+        self.assertEqual(self.registry.get('ibm-jdk-bin-1.5').name(), 'ibm-jdk-bin-1.5')
+        self.assertEqual(self.registry.get('/opt/sun-jre-bin-1.6.0.13').name(), 'sun-jre-bin-1.6')
+        vm = self.registry.get('sun-jdk-1.7')
+        self.assertTrue(self.registry.get(vm.filename()) is vm)
+        self.assertEqual(self.registry.get('9'), None)
+        self.assertEqual(self.registry.get('openjdk'), None)
+
+    def test_prefix(self):
+        self.assertEqual(self.names(self.registry.prefixed('sun-')), ['sun-jdk-1.6', 'sun-jdk-1.7', 'sun-jre-bin-1.6'])
+        self.assertEqual(self.registry.get('sun-').name(), 'sun-jdk-1.7')
+        self.assertEqual(self.registry.get('sun-jre').name(), 'sun-jre-bin-1.6')
+        self.assertEqual(self.em.get_vm('black').name(), 'blackdown-jdk-1.4.2')
+
+    def test_find(self):
+        self.assertEqual(self.names(self.em.find_vm('sun-jdk')), ['sun-jdk-1.6', 'sun-jdk-1.7'])
+        self.assertEqual(self.names(self.em.find_vm('sun-jdk-1.6')), ['sun-jdk-1.6'])
+        self.assertEqual(self.names(self.em.find_vm('sun')), [])
+        self.assertEqual(len(self.em.find_vm('')), 5)
+
+if __name__ == '__main__':
+    unittest.main()
+
+# vim:set expandtab tabstop=4 shiftwidth=4 softtabstop=4 nowrap:
@@ -0,0 +1,30 @@
+import unittest
+
+from java_config_2.VersionKey import version_key, version_cmp
+
+class TestVersionKey(unittest.TestCase):
+
+    def test_cmp(self):
+        self.assertEqual(version_cmp('1.8', '1.10'), -1)
+        self.assertEqual(version_cmp('11', '1.8'), 1)
+        self.assertEqual(version_cmp('1.8', '1.8.0'), 0)
+        self.assertEqual(version_cmp('1.05', '1.5'), -1)
+
+    def test_wildcard(self):
+        self.assertEqual(version_cmp('1.5*', '1.5.2'), 0)
+        self.assertEqual(version_cmp('1.5.2', '1.5*'), 0)
+        self.assertEqual(version_cmp('1.6', '1.5*'), 1)
+        self.assertEqual(version_cmp('1.*', '1.9'), 0)
+
+    def test_sort(self):
+        versions = ['1.10', '1.8.0', '9', '1.5', '1.8.1', '1.05']
+        self.assertEqual(sorted(versions, key=version_key), ['1.05', '1.5', '1.8.0', '1.8.1', '1.10', '9'])
+        self.assertEqual(version_key('1.8'), version_key('1.8.0.0'))
+
+    def test_cached(self):
+        self.assertTrue(version_key('1.7') is version_key('1.7'))
+
+if __name__ == '__main__':
+    unittest.main()
+
+# vim:set expandtab tabstop=4 shiftwidth=4 softtabstop=4 nowrap:
@@ -78,13 +78,22 @@ class TestVersionManager(unittest.TestCase):
         os.environ["USE"] = ""
         self.assertFalse(self.verman.version_satisfies('java6? ( =virtual/jdk-1.6 ) !java6? ( =virtual/jdk-1.5 )', vm))
 
-    #def test_parse_depend(self):
+    def test_parse_depend(self):
+        atoms = self.verman.parse_depend(">=virtual/jdk-1.5 virtual/jre:1.6")
+        self.assertEqual([atom['version'] for atom in atoms], ['1.6', '1.5'])
+        # Changing the result does not change the shared parse
+        atoms[0]['version'] = '9'
+        atoms.pop()
+        self.assertEqual([atom['version'] for atom in self.verman.parse_depend(">=virtual/jdk-1.5 virtual/jre:1.6")], ['1.6', '1.5'])
 
     #def test_get_prefs(self):
 
     #def test_parse_depend_virtuals(self):
 
-    #def test_get_lowest_atom(self):
+    def test_get_lowest_atom(self):
+        atoms = self.verman.parse_depend(">=virtual/jdk-1.10 >=virtual/jre-1.8 virtual/jdk:1.9")
+        self.assertEqual(self.verman.get_lowest_atom(atoms)['version'], '1.8')
+        self.assertRaises(Exception, self.verman.get_lowest_atom, [])
 
     def test_get_lowest(self):
         target = self.verman.get_lowest(">=virtual/jdk-1.4")
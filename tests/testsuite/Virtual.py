@@ -23,6 +23,27 @@ class TestVirtual(unittest.TestCase):
         self.assertEqual( self.jmx2._vms, ['ibm-jdk-bin-1.5', 'sun-jdk-1.6' , \
             'sun-jdk-1.7', 'sun-jre-bin-1.6'] )
 
+class TestLazyVirtual(unittest.TestCase):
+
+    def setUp(self):
+        self.em = EnvironmentManager(os.path.join(os.path.dirname(__file__), 'test_env'))
+
+    def test_load_packages(self):
+        self.em.load_packages()
+        self.assertEqual(sorted(self.em.get_virtuals()), ['jaf', 'jdbc', 'jmx', 'jmx2'])
+        self.assertEqual(self.em.virtual_machines, None)
+        self.assertEqual(self.em.virtual_providers, {})
+
+    def test_package_providers(self):
+        jdbc = self.em.get_virtual('jdbc')
+        self.assertEqual(jdbc.get_packages(), ['jdbc-postgresql', 'jdbc-oracle-bin', 'jdbc-mysql'])
+        self.assertEqual(self.em.virtual_machines, None)
+
+    def test_shared(self):
+        self.assertEqual(self.em.get_virtual('jaf').get_vms(), ['sun-jdk-1.6'])
+        self.assertTrue('jaf' in self.em.virtual_providers)
+        self.assertEqual(Virtual('jaf', self.em).get_vms(), ['sun-jdk-1.6'])
+
 class TestMultiProviderVirtual(unittest.TestCase):
 
     def setUp(self):
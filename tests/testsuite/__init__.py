@@ -1,9 +1,26 @@
-__all__ = [ 'VM', 'Virtual', 'Package', 'VersionManager', 'VersionManagerEnv2', 'EnvironmentManager' ]
+__all__ = [ 'VM', 'Virtual', 'Package', 'VersionManager', 'VersionManagerEnv2', 'EnvironmentManager', 'Cache', 'Server', 'LaunchPlan', 'FileParser', 'DependencyGraph', 'PathBuilder', 'VersionKey', 'VMRegistry', 'ProviderMatrix', 'DirectoryIndex', 'Batch', 'Trace', 'Startup', 'OutputFormatter', 'DependString', 'api', 'AsyncEnvironmentManager' ]
 from . import VM
 from . import Virtual
 from . import Package
 from . import VersionManager
 from . import VersionManagerEnv2
 from . import EnvironmentManager
+from . import Cache
+from . import Server
+from . import LaunchPlan
+from . import FileParser
+from . import DependencyGraph
+from . import PathBuilder
+from . import VersionKey
+from . import VMRegistry
+from . import ProviderMatrix
+from . import DirectoryIndex
+from . import Batch
+from . import Trace
+from . import Startup
+from . import OutputFormatter
+from . import DependString
+from . import api
+from . import AsyncEnvironmentManager
 
 # vim:set expandtab tabstop=4 shiftwidth=4 softtabstop=4 nowrap:
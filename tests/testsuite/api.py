@@ -0,0 +1,67 @@
+import os, shutil, tempfile, unittest
+
+from java_config_2 import api
+
+class TestApi(unittest.TestCase):
+
+    def setUp(self):
+        self.session = api.Session(os.path.join(os.path.dirname(__file__), 'test_env'), '', use_cache=False)
+        self.session.select_vm('ibm-jdk-bin-1.5')
+
+    def test_no_cache(self):
+        session = api.Session(os.path.join(os.path.dirname(__file__), 'test_env'), '')
+        self.assertEqual(session.manager.config_cache, None)
+        self.assertEqual(session.manager.resolution_cache, None)
+
+    def test_vms(self):
+        self.assertEqual(self.session.active_vm().name(), 'ibm-jdk-bin-1.5')
+        self.assertEqual(self.session.java_home(), '/opt/ibm-jdk-bin-1.5.0.6')
+        self.assertEqual(self.session.vm(4).name(), 'sun-jdk-1.7')
+        self.assertEqual([vm.name() for vm in self.session.vms()][:2], ['blackdown-jdk-1.4.2', 'ibm-jdk-bin-1.5'])
+        self.assertRaises(api.InvalidVMError, self.session.vm, 'missing-jdk')
+        self.assertRaises(api.EnvironmentUndefinedError, self.session.vm_query, 'UNDEFINED')
+
+    def test_depend(self):
+        self.assertEqual(self.session.get_vm('>=virtual/jdk-1.5* java-virtuals/jaf').name(), 'sun-jdk-1.6')
+        self.assertRaises(api.NoSuitableVMError, self.session.get_vm, 'virtual/jdk:1.2')
+        self.assertEqual(self.session.lowest('>=virtual/jdk-1.4'), '1.4')
+        self.assertTrue(self.session.is_sufficient('>=virtual/jdk-1.5'))
+        self.assertEqual(self.session.parse_depend('>=virtual/jdk-1.5'), [('>=', 'jdk', '1.5')])
+
+    def test_packages(self):
+        self.assertEqual(self.session.classpath('log4j'), ['/usr/share/log4j/lib/log4j.jar'])
+        self.assertEqual(len(self.session.classpath(['jdbc-mysql'], with_deps=True)), 5)
+        self.assertEqual(self.session.package_query('log4j', 'UNDEFINED'), None)
+        self.assertRaises(api.UnexistingPackageError, self.session.classpath, ['missing'])
+        self.assertRaises(api.UnexistingPackageError, self.session.package, 'missing')
+        self.assertEqual(self.session.launch('log4j')['dep_classpath'], ['/usr/share/log4j/lib/log4j.jar'])
+        self.assertEqual(self.session.launch('log4j', fields=['classpath']),
+                         {'vm': None, 'classpath': '/usr/share/log4j/lib/log4j.jar'})
+
+    def test_missing_dependency(self):
+        root = tempfile.mkdtemp()
+        try:
+            os.makedirs(os.path.join(root, 'usr/share/foo'))
+            with open(os.path.join(root, 'usr/share/foo/package.env'), 'w') as stream:
+                stream.write('CLASSPATH="/usr/share/foo/lib/foo.jar"\nDEPEND="bar"\n')
+            session = api.Session(root, '', use_cache=False)
+            missing = set()
+            self.assertEqual(session.classpath(['foo'], True, missing), ['/usr/share/foo/lib/foo.jar'])
+            self.assertEqual(missing, set(['bar']))
+            try:
+                session.classpath(['foo'], True)
+                self.fail()
+            except api.MissingDependencyError as e:
+                self.assertEqual(e.missing, ['bar'])
+        finally:
+            shutil.rmtree(root)
+
+    def test_reload(self):
+        manager = self.session.manager
+        self.session.reload()
+        self.assertFalse(self.session.manager is manager)
+
+if __name__ == '__main__':
+    unittest.main()
+
+# vim:set expandtab tabstop=4 shiftwidth=4 softtabstop=4 nowrap: